@@ -1,14 +1,135 @@
+"""AEMO NEM data client.
+
+Only the constants and time window helpers are imported with the package.
+Every other name is imported on first access, so the network client,
+aiohttp and NumPy are only loaded when used. ``aemonemdata.core`` imports
+the dependency-free parsers directly.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from .constants import (
     EndPoint,
     BaseUrl,
     REGIONS,
     AUTH_ERROR_CODES
 )
-from .aemonem import (
-    AemoNemData,
-    )
-
 from .utils import (
-    current_30min_window
+    current_30min_window,
+    current_5min_window,
+    next_publish_time,
 )
-__all__ = ["EndPoint","BaseUrl","REGIONS","AUTH_ERROR_CODES","AemoNemData","current_30min_window"]
+
+if TYPE_CHECKING:
+    from .aemonem import (
+        AemoNemData,
+        )
+    from .aggregate import (
+        TradingIntervals,
+        aggregate_30min,
+    )
+    from .backfill import (
+        Backfill,
+        DashboardSource,
+    )
+    from .cache import (
+        BaseResponseCache,
+        CacheEntry,
+        ResponseCache,
+    )
+    from .cache_backends import (
+        RedisResponseCache,
+        RespClient,
+        SqliteResponseCache,
+        start_resp_server,
+    )
+    from .hub import (
+        AemoNemHub,
+    )
+    from .instrumentation import (
+        Stats,
+        create_trace_config,
+    )
+    from .interval_store import (
+        IntervalStore,
+    )
+    from .market_index import (
+        MarketChange,
+        MarketIndex,
+    )
+    from .records import (
+        InterconnectorFlow,
+        PriceInterval,
+        RegionSummary,
+        parse_5min_record,
+    )
+    from .scheduler import (
+        CircuitBreaker,
+        RequestScheduler,
+        RetryPolicy,
+    )
+    from .snapshot import (
+        SnapshotStore,
+    )
+    from .transport import (
+        AiohttpTransport,
+        Fault,
+        FaultInjectingTransport,
+        ReplayTransport,
+        Transport,
+        TransportResponse,
+        create_replay_app,
+    )
+
+_LAZY_IMPORTS = {
+    "AemoNemData": ".aemonem",
+    "TradingIntervals": ".aggregate",
+    "aggregate_30min": ".aggregate",
+    "Backfill": ".backfill",
+    "DashboardSource": ".backfill",
+    "BaseResponseCache": ".cache",
+    "CacheEntry": ".cache",
+    "ResponseCache": ".cache",
+    "RedisResponseCache": ".cache_backends",
+    "RespClient": ".cache_backends",
+    "SqliteResponseCache": ".cache_backends",
+    "start_resp_server": ".cache_backends",
+    "AemoNemHub": ".hub",
+    "Stats": ".instrumentation",
+    "create_trace_config": ".instrumentation",
+    "IntervalStore": ".interval_store",
+    "MarketChange": ".market_index",
+    "MarketIndex": ".market_index",
+    "InterconnectorFlow": ".records",
+    "PriceInterval": ".records",
+    "RegionSummary": ".records",
+    "parse_5min_record": ".records",
+    "CircuitBreaker": ".scheduler",
+    "RequestScheduler": ".scheduler",
+    "RetryPolicy": ".scheduler",
+    "SnapshotStore": ".snapshot",
+    "AiohttpTransport": ".transport",
+    "Fault": ".transport",
+    "FaultInjectingTransport": ".transport",
+    "ReplayTransport": ".transport",
+    "Transport": ".transport",
+    "TransportResponse": ".transport",
+    "create_replay_app": ".transport",
+}
+
+
+def __getattr__(name: str):
+    """Import the module that defines name on first access."""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+__all__ = ["EndPoint","BaseUrl","REGIONS","AUTH_ERROR_CODES","AemoNemData","AemoNemHub","TradingIntervals","aggregate_30min","Backfill","DashboardSource","BaseResponseCache","CacheEntry","ResponseCache","RedisResponseCache","RespClient","SqliteResponseCache","start_resp_server","InterconnectorFlow","IntervalStore","MarketChange","MarketIndex","Stats","create_trace_config","PriceInterval","RegionSummary","parse_5min_record","CircuitBreaker","RequestScheduler","RetryPolicy","SnapshotStore","AiohttpTransport","Fault","FaultInjectingTransport","ReplayTransport","Transport","TransportResponse","create_replay_app","current_30min_window","current_5min_window","next_publish_time"]
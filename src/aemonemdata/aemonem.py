@@ -1,276 +1,581 @@
 """AemoNemData class to get data from AEMO API."""
+import asyncio
 import json
-from typing import Any
-from datetime import datetime, timedelta
-from aiohttp import ClientSession, ClientResponse
+from collections.abc import AsyncIterator
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+from datetime import datetime, timedelta, timezone
+from aiohttp import BaseConnector, ClientSession, ClientTimeout, TCPConnector
+from aiohttp import ClientError as AiohttpClientError
 
-from .utils import current_30min_window
+from .cache import BaseResponseCache, CacheEntry, ResponseCache
+from .instrumentation import Instrument, create_trace_config
+from .interval_store import IntervalStore
+from .market_index import MarketChange, MarketIndex
+from .records import PriceInterval, RegionSummary, parse_5min_record
+from .scheduler import RequestScheduler
+from .transport import AiohttpTransport, Transport
+from .utils import current_30min_window, next_publish_time
 
 from .constants import (
     BaseUrl,
     EndPoint,
     REGIONS,
     AUTH_ERROR_CODES,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_RETENTION,
+    DISPATCH_PUBLISH_OFFSET,
+    DEFAULT_STALE_TIMEOUT,
+    FETCH_LEASE,
+    LEASE_POLL_INTERVAL,
+    SUBSCRIBE_RETRY_MIN,
+    SUBSCRIBE_RETRY_MAX,
 )
 from .exceptions import (
         AuthError,
         ClientError,
 )
 
+if TYPE_CHECKING:
+    # NumPy is only loaded when columnar parsing or a snapshot is used.
+    from .columnar import CumulPriceBlock
+    from .snapshot import SnapshotStore
+
 
 class AemoNemData:
-    """AEMO Nem Data transformation and processing."""
+    """AEMO Nem Data transformation and processing.
+
+    When no client_session is given, one session with a keep-alive connector
+    is created on first use and kept until ``close()``. Use the instance as an
+    async context manager to close it automatically.
+
+    Requests go through ``transport``, which defaults to an AiohttpTransport
+    over the session. Pass a ReplayTransport to run against recorded payloads.
+
+    Cumulative price intervals are merged into a rolling IntervalStore that
+    keeps ``retention`` of history, and the 5MIN records kept by ``get_data``
+    are trimmed to the same window. ``columnar`` instead parses each
+    cumulative price payload with the NumPy parser and keeps no history.
+
+    ``snapshot`` persists each cumulative price payload to a SnapshotStore,
+    and the interval store is warm-started from it before the first merge.
+
+    Requests go through ``scheduler``, which retries transient failures with
+    jittered backoff, opens a circuit per endpoint after repeated failures and
+    shares one in-flight request between concurrent callers. When a request
+    fails or takes longer than ``stale_timeout`` and a cached response exists,
+    that response is used and its report is listed in the ``stale`` results.
 
-    def __init__(self: str, client_session: ClientSession = None):
+    ELEC_NEM_SUMMARY payloads are merged into a MarketIndex. The results list
+    the interconnector limit and market notice ``changes`` seen since the
+    previous results.
+
+    ``instrumentation`` is called with timings and counters for each request
+    and processing phase, see the instrumentation module. When it is None no
+    measurements are taken.
+    """
+
+    def __init__(
+            self: str,
+            client_session: ClientSession = None,
+            cache: BaseResponseCache = None,
+            timeout: ClientTimeout = None,
+            connector: BaseConnector = None,
+            columnar: bool = False,
+            retention: timedelta = DEFAULT_RETENTION,
+            transport: Transport = None,
+            instrumentation: Instrument = None,
+            snapshot: "SnapshotStore" = None,
+            scheduler: RequestScheduler = None,
+            stale_timeout: timedelta | None = DEFAULT_STALE_TIMEOUT,
+        ):
         self._region_id = None
         self._aemo_data_full = {}
         self._aemo_data_now = {}
-        self._aemo_data_cumul_price = {}
-        self._aemo_data_results ={}
-        self._aemo_data_elec_nem_summary = {}
+        self._market_index = MarketIndex()
+        self._market_changes: list[MarketChange] = []
+        self._aemo_data_elec_nem_summary = self._market_index.summaries
         self._aemo_data_elec_nem_summary_market_notice = []
-        self._aemo_data_elec_nem_summary_prices = {}
+        self._aemo_data_elec_nem_summary_prices = self._market_index.prices
         self._aemo_data_actual = []
         self._aemo_data_forecast = []
-        self._timeout = 15
-        self._session = client_session #ClientSession = client_session if client_session else ClientSession()
+        self._timeout = timeout if timeout is not None else ClientTimeout(
+            total=None,
+            connect=DEFAULT_CONNECT_TIMEOUT,
+            sock_read=DEFAULT_READ_TIMEOUT,
+        )
+        self._session = client_session
         self._session_manage = True
+        self._connector = connector
+        self._columnar = columnar
+        if self._columnar:
+            from .columnar import HAS_NUMPY
+            if not HAS_NUMPY:
+                raise ImportError("columnar parsing requires numpy")
+        self._retention = retention
+        self._interval_store = IntervalStore(retention)
+        self._snapshot = snapshot
+        self._snapshot_warm_start: asyncio.Future | None = None
+        self._transport = transport if transport is not None else AiohttpTransport(self._ensure_session, self._timeout)
         self._ameo_mkt_limits = {}
         self._mkt_cap = None
+        self._cache = cache if cache is not None else ResponseCache()
+        self._instrument = instrumentation
+        self._scheduler = scheduler if scheduler is not None else RequestScheduler(instrumentation=instrumentation)
+        self._stale_timeout = stale_timeout
         if client_session:
             self._session_manage = False
 
     async def get_aemo_data(self, state: list) -> dict[str, Any]:
         """Get AEMO Data."""
-        regions = []
-        if state is not None:
-            if self._session_manage:
-                self._session = ClientSession()
-            for region in state:
-                regions.append(REGIONS[region.lower()])
-            await self._get_current_30min_price(regions)
-            self._aemo_data_results.pop("current_price")
-            if self._session_manage:
-                await self._session.close()
-        return self._aemo_data_results
+        if state is None:
+            return {}
+        return await self.get_region_data([REGIONS[region.lower()] for region in state])
+
+    async def get_region_data(self, regions: list[str], revalidate: bool = False) -> dict[str, Any]:
+        """Return the get_aemo_data results for region ids such as 'NSW1'.
+
+        Each call builds its own results, so concurrent calls for different
+        regions do not see each other's regions or stale reports.
+        ``revalidate`` bypasses a fresh cache entry of the cumulative price
+        feed.
+        """
+        results = await self._get_current_30min_price(regions, revalidate)
+        results.pop("current_price")
+        return results
+
+    @property
+    def market_index(self) -> MarketIndex:
+        """Return the index of region summaries, interconnectors and market notices."""
+        return self._market_index
+
+    async def subscribe(
+            self,
+            state: list,
+            publish_offset: timedelta = DISPATCH_PUBLISH_OFFSET
+        ) -> AsyncIterator[dict[str, Any]]:
+        """Yield get_aemo_data results each time a dispatch interval is published.
+
+        The current results are yielded straight away. After that the
+        generator sleeps until the next dispatch boundary plus publish_offset,
+        polls ELEC_NEM_SUMMARY with exponential backoff until its settlement
+        date moves on, and only then fetches and yields the new results.
+        """
+        regions = [REGIONS[region.lower()] for region in state]
+        results = await self.get_region_data(regions)
+        while True:
+            settlement_date = self._latest_settlement_date()
+            yield results
+            await self._wait_for_dispatch(settlement_date, publish_offset)
+            results = await self.get_region_data(regions, revalidate=True)
+
+    async def wait_for_dispatch(self, publish_offset: timedelta = DISPATCH_PUBLISH_OFFSET) -> None:
+        """Wait until a dispatch interval newer than the last one seen is published.
+
+        Sleeps until the next dispatch boundary plus publish_offset, then
+        polls ELEC_NEM_SUMMARY with exponential backoff until its settlement
+        date moves on.
+        """
+        await self._wait_for_dispatch(self._latest_settlement_date(), publish_offset)
+
+    async def _wait_for_dispatch(self, previous: datetime | None, publish_offset: timedelta) -> None:
+        """Sleep until the next publish time, then wait for a settlement date after previous."""
+        now = datetime.now(timezone.utc)
+        await asyncio.sleep((next_publish_time(now, publish_offset) - now).total_seconds())
+        await self._wait_for_settlement(previous)
+
+    async def _wait_for_settlement(self, previous: datetime | None) -> None:
+        """Poll ELEC_NEM_SUMMARY until its settlement date is after previous."""
+        delay = SUBSCRIBE_RETRY_MIN
+        while True:
+            try:
+                await self._get_mkt_limit(revalidate=True)
+            except (ClientError, AiohttpClientError, asyncio.TimeoutError):
+                pass
+            else:
+                latest = self._latest_settlement_date()
+                if latest is not None and (previous is None or latest > previous):
+                    return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SUBSCRIBE_RETRY_MAX)
+
+    def _latest_settlement_date(self) -> datetime | None:
+        """Return the newest ELEC_NEM_SUMMARY settlement date seen."""
+        return max(
+            (summary.settlement_date for summary in self._aemo_data_elec_nem_summary.values()),
+            default=None,
+        )
+
+    async def __aenter__(self) -> "AemoNemData":
+        """Enter the client context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the session."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the transport and the session if it was created by this instance."""
+        await self._transport.close()
+        if self._session_manage and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _ensure_session(self) -> ClientSession:
+        """Return the session, creating a pooled one if needed.
+
+        A connector passed to the constructor belongs to the caller. Sessions
+        use it without owning it, so ``close()`` leaves it open, and it is
+        never swapped for a new one.
+        """
+        if self._session is None or (self._session_manage and self._session.closed):
+            connector = self._connector
+            if connector is None:
+                connector = TCPConnector(
+                    limit=DEFAULT_CONNECTION_LIMIT,
+                    limit_per_host=DEFAULT_CONNECTION_LIMIT,
+                    keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=DEFAULT_DNS_CACHE_TTL,
+                )
+            elif connector.closed:
+                raise RuntimeError("The connector passed to AemoNemData is closed")
+            trace_configs = [create_trace_config(self._instrument)] if self._instrument is not None else None
+            self._session = ClientSession(
+                connector=connector,
+                connector_owner=self._connector is None,
+                timeout=self._timeout,
+                trace_configs=trace_configs,
+            )
+        return self._session
+
+    def _timer(self, metric: str, **tags: str):
+        """Return a context manager that reports its duration, or a no-op one."""
+        if self._instrument is None:
+            return nullcontext()
+        return self._timed(metric, tags)
+
+    @contextmanager
+    def _timed(self, metric: str, tags: dict[str, str]):
+        """Report the duration of the block to the instrument."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._instrument(metric, perf_counter() - start, tags)
 
 
     async def get_data(self, region: str) -> dict[str, Any]:
         """Get AEMO Data."""
         self._region_id = region
         _first_forecast = False
+        records = await self.get_5min_records()
+        with self._timer("parse_s", endpoint="5MIN"):
+            actual = {(record['REGIONID'], record['SETTLEMENTDATE']): record for record in self._aemo_data_actual}
+            forecast = [record for record in self._aemo_data_forecast if record['REGIONID'] != self._region_id]
+            for record in records:
+                if record['REGIONID'] == self._region_id:
+                    record = parse_5min_record(record)
+                    if record['PERIODTYPE'] == 'ACTUAL':
+                        actual[(record['REGIONID'], record['SETTLEMENTDATE'])] = record
+                    elif record['PERIODTYPE'] == 'FORECAST':
+                        forecast.append(record)
+                        if not _first_forecast:
+                            _first_forecast = True
+                            self._aemo_data_now = record
+            if actual:
+                cutoff = max(settlement_date for _, settlement_date in actual) - self._retention
+                actual = {key: record for key, record in actual.items() if key[1] >= cutoff}
+            self._aemo_data_actual = sorted(actual.values(), key=lambda x:x['SETTLEMENTDATE'])
+            self._aemo_data_forecast = forecast
+        if self._instrument is not None:
+            self._instrument("records", len(records), {"endpoint": "5MIN"})
+        return self._aemo_data_actual, self._aemo_data_forecast
+
+    async def stream_data(self, region: str, period_type: str = None) -> AsyncIterator[dict[str, Any]]:
+        """Stream AEMO 5MIN Data for a region.
+
+        Records are decoded one at a time from the response body with ijson
+        and yielded as they arrive, optionally limited to one PERIODTYPE
+        ('ACTUAL' or 'FORECAST'). Without ijson the body is decoded in full
+        before the records are yielded.
+        """
         post_data = {"timeScale":["30MIN"]}
         headers = {
             'Content_type': 'text/json',
             'accept': 'text/plain'
         }
         full_url = f'{BaseUrl.API}{EndPoint.API_5MIN_URL}'
-        response = await self._api_post_json(full_url, headers, post_data)
-        for record in response['5MIN']:
-            if record['REGIONID'] == self._region_id:
-                record['SETTLEMENTDATE']=datetime.fromisoformat(record['SETTLEMENTDATE']+'+10:00')
-                record['SPOTPRICEPERKW']= round(record['RRP']/1000,4)
-                if record['PERIODTYPE'] == 'ACTUAL':
-                    record['PERIODSTARTDATE'] = record['SETTLEMENTDATE'] - timedelta(minutes=5)
-                    self._aemo_data_actual.append(record)
-                elif record['PERIODTYPE'] == 'FORECAST':
-                    record['PERIODSTARTDATE'] = record['SETTLEMENTDATE'] - timedelta(minutes=30)
-                    self._aemo_data_forecast.append(record)
-                    if not _first_forecast:
-                        _first_forecast = True
-                        self._aemo_data_now = record
-        return self._aemo_data_actual, self._aemo_data_forecast
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        if ijson is None:
+            response = await self._api_post_json(full_url, headers, post_data)
+            for record in response['5MIN']:
+                if record['REGIONID'] == region and period_type in (None, record['PERIODTYPE']):
+                    yield parse_5min_record(record)
+            return
+        async with self._transport.stream("POST", full_url, headers, json=post_data) as (status, content):
+            if status != 200:
+                self._api_check_status(status, await content.read())
+            try:
+                async for record in ijson.items_async(content, '5MIN.item', use_float=True):
+                    if record['REGIONID'] == region and period_type in (None, record['PERIODTYPE']):
+                        yield parse_5min_record(record)
+            except ijson.JSONError as error:
+                raise ClientError(f'Could not return json {error}') from error
 
     async def _get_data_full(self) -> dict[str, Any]:
         """Get AEMO Data."""
-        post_data = {"timeScale":["30MIN"]}
-        headers = {
-            'Content_type': 'text/json',
-            'accept': 'text/plain'
-        }
-        full_url = f'{BaseUrl.API}{EndPoint.API_5MIN_URL}'
-        response = await self._api_post_json(full_url, headers, post_data)
-        for record in response['5MIN']:
+        self._aemo_data_full = {}
+        for record in await self.get_5min_records():
             record['SETTLEMENTDATE']=datetime.fromisoformat(record['SETTLEMENTDATE']+'+10:00')
             record['SPOTPRICEPERKW']= round(record['RRP']/1000,4)
             if record['PERIODTYPE'] not in self._aemo_data_full:
                 self._aemo_data_full[record['PERIODTYPE']] = {}
             record['PERIODSTARTDATE'] = record['SETTLEMENTDATE'] - timedelta(minutes=5)
-            self._aemo_data_actual.append(record)
             if record['REGIONID'] not in self._aemo_data_full[record['PERIODTYPE']]:
                 self._aemo_data_full[record['PERIODTYPE']][record['REGIONID']] = []
             self._aemo_data_full[record['PERIODTYPE']][record['REGIONID']].append(record)          
         return self._aemo_data_full
 
-    async def _get_current_cumulative_price(self) -> dict[str, Any]:
-        """Get AEMO Data."""
+    async def get_5min_records(self) -> list[dict[str, Any]]:
+        """Return the raw 5MIN records, as parse_5min_record takes them."""
+        post_data = {"timeScale":["30MIN"]}
+        headers = {
+            'Content_type': 'text/json',
+            'accept': 'text/plain'
+        }
+        full_url = f'{BaseUrl.API}{EndPoint.API_5MIN_URL}'
+        response = await self._api_post_json(full_url, headers, post_data)
+        return response['5MIN']
+
+    async def get_cumulative_price_records(self, revalidate: bool = False, stale: set[str] = None) -> list[dict[str, Any]]:
+        """Return the raw NEM_DASHBOARD_CUMUL_PRICE records, as PriceInterval.from_cumul_price takes them.
+
+        ``revalidate`` bypasses a fresh cache entry. When a cached response
+        is served in place of a failed or slow request, the report name is
+        added to ``stale``.
+        """
         headers = {
             'Content_type': 'text/json',
             'accept': 'text/plain'
         }
         full_url = f'{BaseUrl.API}{EndPoint.API_CUMULATIVE_PRICE_URL}'
-        response = await self._api_get(full_url, headers, None)
-        for record in response['NEM_DASHBOARD_CUMUL_PRICE']:
-            clean_record = {}
-            if record["A"] == 1:
-                clean_record["period_type"] = "actual"
-                clean_record["settlement_date"]=datetime.fromisoformat(record["DT"]+'+10:00')
-                clean_record["period_start_date"] = clean_record["settlement_date"] - timedelta(minutes=5)
-            elif record["A"] == 0:
-                clean_record["period_type"] = "forecast"
-                clean_record["settlement_date"]=datetime.fromisoformat(record["DT"]+'+10:00')
-                clean_record["period_start_date"] = clean_record["settlement_date"] - timedelta(minutes=30)
-            clean_record["region_id"] = record["R"]
-            clean_record["price_mw"] = record["P"]
-            clean_record["price_kw"] = round(record["P"]/1000,4)
-            clean_record["cumulative_price"] = record["CP"]
-            if clean_record["period_type"] not in self._aemo_data_cumul_price:
-                self._aemo_data_cumul_price[clean_record["period_type"]] = {}
-            if clean_record["region_id"] not in self._aemo_data_cumul_price[clean_record["period_type"]]:
-                self._aemo_data_cumul_price[clean_record["period_type"]][clean_record["region_id"]] = []
-            self._aemo_data_cumul_price[clean_record["period_type"]][clean_record["region_id"]].append(clean_record)
-
-        return self._aemo_data_cumul_price
-
-    async def _get_current_cumul_price(self):
-        """Get AEMO Data."""
-        test= await self._get_current_cumulative_price()
-        self._aemo_data_cumul_price = {}
-        for region in test["actual"]:
-            actual_current = max(test["actual"][region], key=lambda x:x["SETTLEMENTDATE"])
-            test["actual"][region] = sorted(test["actual"][region], key=lambda x:x["SETTLEMENTDATE"])
-            if "current" not in self._aemo_data_cumul_price:
-                self._aemo_data_cumul_price["current"] = {}
-            self._aemo_data_cumul_price["current"][region] = actual_current
-        return
+        response = await self._api_get(full_url, headers, None, revalidate, stale)
+        return response['NEM_DASHBOARD_CUMUL_PRICE']
 
-    async def _get_current_30min_price(self, regions: list[str]):
+    async def _get_cumulative_price_data(
+            self,
+            revalidate: bool = False,
+            stale: set[str] = None,
+        ) -> "IntervalStore | CumulPriceBlock":
+        """Get AEMO Data merged into the interval store, or as a columnar block."""
+        if self._snapshot is not None and not self._columnar:
+            # Warm-start once, before the first fetch, so the history is there
+            # even when the feed is down. Concurrent callers share the load.
+            if self._snapshot_warm_start is None:
+                self._snapshot_warm_start = asyncio.get_running_loop().run_in_executor(
+                    None, self._snapshot.warm_start, self._interval_store
+                )
+            await self._snapshot_warm_start
+        records = await self.get_cumulative_price_records(revalidate, stale)
+        if self._instrument is not None:
+            self._instrument("records", len(records), {"endpoint": "NEM_DASHBOARD_CUMUL_PRICE"})
+        with self._timer("parse_s", endpoint="NEM_DASHBOARD_CUMUL_PRICE"):
+            block = None
+            if self._columnar or self._snapshot is not None:
+                from .columnar import CumulPriceBlock
+                block = CumulPriceBlock(records)
+            if not self._columnar:
+                changed = self._interval_store.merge_cumul_price(records)
+                if self._instrument is not None:
+                    self._instrument("regions_changed", len(changed), {"endpoint": "NEM_DASHBOARD_CUMUL_PRICE"})
+        if self._snapshot is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._snapshot.append_block, block)
+        if self._columnar:
+            return block
+        return self._interval_store
+
+    async def _get_current_30min_price(self, regions: list[str], revalidate: bool = False) -> dict[str, Any]:
         """Get AEMO Data."""
-        self._aemo_data_results = {}
-        self._aemo_data_cumul_price = {}
+        results = {}
         current_30min_window_start, current_30min_window_end = current_30min_window()
-        current_price_data= await self._get_current_cumulative_price()
-        if self._mkt_cap is None:
-            self._mkt_cap = await self._get_mkt_limit_cap()
-        mkt_limits = await self._get_mkt_limit()
-        if "current_price" not in self._aemo_data_results:
-            self._aemo_data_results["current_price"] = {}
+        current_price_data, mkt_limits = await self._fetch_dashboard_data(results, revalidate)
+        with self._timer("aggregate_s"):
+            self._aggregate_30min_price(results, regions, current_price_data, mkt_limits, current_30min_window_start, current_30min_window_end)
+        return results
+
+    def _aggregate_30min_price(
+            self,
+            results: dict[str, Any],
+            regions: list[str],
+            current_price_data: "IntervalStore | CumulPriceBlock",
+            mkt_limits: dict[str, RegionSummary],
+            current_30min_window_start: datetime,
+            current_30min_window_end: datetime,
+        ):
+        """Build the per-region results for the current 30 minute window into results."""
+        region_views = {}
         for region in regions:
-            if region not in self._aemo_data_results["current_price"]:
-                self._aemo_data_results["current_price"][region] = []
-        for region in current_price_data["actual"]:
-            if region in regions:
-                for record in current_price_data["actual"][region]:
-                    if record["period_start_date"] >= current_30min_window_start and record["period_start_date"] < current_30min_window_end:
-                        self._aemo_data_results["current_price"][region].append(record)
-        for region in current_price_data["actual"]:
+            region_view = current_price_data.region_view(region, current_30min_window_start, current_30min_window_end)
+            if region_view is not None:
+                region_views[region] = region_view
+        results["current_price"] = {region: [] for region in regions}
+        for region, region_view in region_views.items():
+            results["current_price"][region] = region_view.window
             period_order = {}
-            if region in regions:
-                if "current_price_window" not in self._aemo_data_results:
-                    self._aemo_data_results["current_price_window"] = {}
-                if region not in self._aemo_data_results["current_price_window"]:
-                    self._aemo_data_results["current_price_window"][region] = {}
-                for record in current_price_data["actual"][region]:
-                    if record["period_start_date"] >= current_30min_window_start and record["period_start_date"] < current_30min_window_end:
-
-                        if record["period_start_date"].minute == 0 or record["period_start_date"].minute == 30:
-                            period_order["period_1"]=record
-                        elif record["period_start_date"].minute == 5 or record["period_start_date"].minute == 35:
-                            period_order["period_2"]=record
-                        elif record["period_start_date"].minute == 10 or record["period_start_date"].minute == 40:
-                            period_order["period_3"]=record
-                        elif record["period_start_date"].minute == 15 or record["period_start_date"].minute == 45:
-                            period_order["period_4"]=record
-                        elif record["period_start_date"].minute == 20 or record["period_start_date"].minute == 50:
-                            period_order["period_5"]=record
-                        elif record["period_start_date"].minute == 25 or record["period_start_date"].minute == 55:
-                            period_order["period_6"]=record
-                        self._aemo_data_results["current_price_window"][region]=period_order
-                x_while = len(self._aemo_data_results["current_price_window"][region])
-                while x_while <6:
-                    x_while +=1
-                    if len(self._aemo_data_results["current_price_window"][region]) > 0:
-                        if "period_"+str(x_while) not in self._aemo_data_results["current_price_window"][region]:
-                            blank_period = {
-                                "period_type":None,
-                                "settlement_date": None,
-                                "period_start_date": None,
-                                "region_id": region,
-                                "price_mw": None,
-                                "price_kw": None,
-                                "cumulative_price": None,
-                            }
-                            self._aemo_data_results["current_price_window"][region]["period_"+str(x_while)]= blank_period
-                    else:
-                        blank_period = {
-                            "period_type":None,
-                            "settlement_date": None,
-                            "period_start_date": None,
-                            "region_id": region,
-                            "price_mw": None,
-                            "price_kw": None,
-                            "cumulative_price": None,
-                        }
-                        self._aemo_data_results["current_price_window"][region]["period_"+str(x_while)]= blank_period
-        for region in self._aemo_data_results["current_price"]:
-            if region in regions:
-                records_count = len(self._aemo_data_results["current_price"][region])
-                current_actual_prices = sum(item["price_kw"] for item in self._aemo_data_results["current_price"][region])
-                current_5min_price = (max(current_price_data["actual"][region], key=lambda x:x["settlement_date"]))["price_kw"]
-                if records_count !=0 :
-                    current_30min_avg = round(current_actual_prices/records_count,4)
-                else:
-                    current_30min_avg = None
-                current_30min_forecast = round((min(current_price_data["forecast"][region], key=lambda x:x["settlement_date"]))["price_kw"],4)
+            if "current_price_window" not in results:
+                results["current_price_window"] = {}
+            results["current_price_window"][region] = period_order
+            for record in region_view.window:
+                period = record.period_start_date.minute % 30 // 5 + 1
+                period_order[f"period_{period}"] = record.as_dict()
+            x_while = len(period_order)
+            has_records = x_while > 0
+            while x_while <6:
+                x_while +=1
+                if not has_records or "period_"+str(x_while) not in period_order:
+                    period_order["period_"+str(x_while)] = PriceInterval.empty(region).as_dict()
+        for region, region_view in region_views.items():
+            records_count = len(region_view.window)
+            current_actual_prices = sum(item.price_kw for item in region_view.window)
+            current_5min_price = region_view.latest_actual.price_kw
+            if records_count !=0 :
+                current_30min_avg = round(current_actual_prices/records_count,4)
+            else:
+                current_30min_avg = None
+            if region_view.first_forecast is not None:
+                current_30min_forecast = round(region_view.first_forecast.price_kw,4)
                 current_30min_estimated = round((current_actual_prices + current_30min_forecast*(6-records_count))/6,4)
-                current_cumulative_price = round((max(current_price_data["actual"][region], key=lambda x:x["settlement_date"]))["cumulative_price"],0)
-                if "current_30min_forecast" not in self._aemo_data_results:
-                    self._aemo_data_results["current_30min_forecast"] = {}
-                if region not in self._aemo_data_results["current_30min_forecast"]:
-                    self._aemo_data_results["current_30min_forecast"][region] = {}
-                forcast_data = []
-                for record in current_price_data["forecast"][region]:
-                    forcast_data.append({"start_time": record["period_start_date"] ,"end_time": record["settlement_date"], "price": record["price_kw"]})
-                data = {
-                    "current_5min_period_price": current_5min_price,
-                    "current_30min_avg": current_30min_avg,
-                    "current_30min_forecast": current_30min_forecast,
-                    "current_30min_estimated": current_30min_estimated,
-                    "current_cumulative_price": int(current_cumulative_price),
+            else:
+                current_30min_forecast = None
+                current_30min_estimated = None
+            current_cumulative_price = round(region_view.latest_actual.cumulative_price,0)
+            if "current_30min_forecast" not in results:
+                results["current_30min_forecast"] = {}
+            forcast_data = []
+            for record in region_view.forecast:
+                forcast_data.append({"start_time": record.period_start_date ,"end_time": record.settlement_date, "price": record.price_kw})
+            data = {
+                "current_5min_period_price": current_5min_price,
+                "current_30min_avg": current_30min_avg,
+                "current_30min_forecast": current_30min_forecast,
+                "current_30min_estimated": current_30min_estimated,
+                "current_cumulative_price": int(current_cumulative_price),
+                "periods_of_current_30min": records_count,
+                "forecast": forcast_data,
+                "degraded": False,
+            }
+            if self._mkt_cap:
+                data.update({
                     "current_percent_cumulative_price": round(current_cumulative_price/self._mkt_cap["CumulativePriceThreshold"]*100,2),
                     "administered_price_cap": self._mkt_cap["AdministeredPriceCap"],
                     "market_price_cap": self._mkt_cap["MarketPriceCap"],
                     "cumulative_price_threshold": self._mkt_cap["CumulativePriceThreshold"],
-                    "market_suspended_flag": (True if mkt_limits[region]["MARKETSUSPENDEDFLAG"] ==1 else False),
-                    "apc_flag": (True if mkt_limits[region]["APCFLAG"] == 1 else False),
-                    "periods_of_current_30min": records_count,
-                    "forecast": forcast_data,
-                    "total_demand": mkt_limits[region]["TOTALDEMAND"],
-                    "scheduled_generation": mkt_limits[region]["SCHEDULEDGENERATION"],
-                    "interconnector_flows": mkt_limits[region]["INTERCONNECTORFLOWS"],
-                    "semi_scheduled_generation": mkt_limits[region]["SEMISCHEDULEDGENERATION"],
-                    "net_interconnector_flows": mkt_limits[region]["NETINTERCHANGE"],
-                    "settlement_date_str": mkt_limits[region]["SETTLEMENTDATE"],
-                    "settlement_date": datetime.fromisoformat(mkt_limits[region]["SETTLEMENTDATE"]+'+10:00'),
-                }
-                for flow in mkt_limits[region]["INTERCONNECTORFLOWS"]:
-                    data[f"flow_{flow["name"]}_name"] = flow["name"]
-                    data[f"flow_{flow["name"]}_value"] = flow["value"]
-                    data[f"flow_{flow["name"]}_export_limit"] = flow["exportlimit"]
-                    data[f"flow_{flow["name"]}_import_limit"] = flow["importlimit"]
-
-                self._aemo_data_results["current_30min_forecast"][region] = data
+                })
+            else:
+                data["degraded"] = True
+                data.update({
+                    "current_percent_cumulative_price": None,
+                    "administered_price_cap": None,
+                    "market_price_cap": None,
+                    "cumulative_price_threshold": None,
+                })
+            if region in mkt_limits:
+                summary = mkt_limits[region]
+                data.update({
+                    "market_suspended_flag": summary.market_suspended_flag,
+                    "apc_flag": summary.apc_flag,
+                    "total_demand": summary.total_demand,
+                    "scheduled_generation": summary.scheduled_generation,
+                    "interconnector_flows": [flow.as_dict() for flow in summary.interconnector_flows],
+                    "semi_scheduled_generation": summary.semi_scheduled_generation,
+                    "net_interconnector_flows": summary.net_interchange,
+                    "settlement_date_str": summary.settlement_date_str,
+                    "settlement_date": summary.settlement_date,
+                })
+                for flow in summary.interconnector_flows:
+                    data[f"flow_{flow.name}_name"] = flow.name
+                    data[f"flow_{flow.name}_value"] = flow.value
+                    data[f"flow_{flow.name}_export_limit"] = flow.export_limit
+                    data[f"flow_{flow.name}_import_limit"] = flow.import_limit
+            else:
+                data["degraded"] = True
+                data.update({
+                    "market_suspended_flag": None,
+                    "apc_flag": None,
+                    "total_demand": None,
+                    "scheduled_generation": None,
+                    "interconnector_flows": None,
+                    "semi_scheduled_generation": None,
+                    "net_interconnector_flows": None,
+                    "settlement_date_str": None,
+                    "settlement_date": None,
+                })
+
+            results["current_30min_forecast"][region] = data
         return
 
+    async def _fetch_dashboard_data(
+            self,
+            results: dict[str, Any],
+            revalidate: bool = False,
+        ) -> tuple["IntervalStore | CumulPriceBlock", dict[str, Any]]:
+        """Fetch the dashboard endpoints concurrently and record their status in results.
+
+        The cumulative price feed is required and any error from it is raised.
+        Failures of the market price limits or ELEC_NEM_SUMMARY calls are
+        recorded in ``errors`` and the results are flagged as degraded, as
+        they are when a cached response is served in place of a failed or
+        slow request. ``revalidate`` bypasses a fresh cache entry of the
+        cumulative price feed.
+
+        The market changes pending from earlier calls are taken when the call
+        starts, so each change is reported by exactly one call.
+        """
+        changes, self._market_changes = self._market_changes, []
+        stale = set()
+        requests = {
+            EndPoint.API_CUMULATIVE_PRICE_URL: self._get_cumulative_price_data(revalidate, stale),
+            EndPoint.API_MARKET_LIMITS_URL: self._get_mkt_limit_cap(stale),
+            EndPoint.API_ELEC_NEM_SUMMARY_URL: self._get_mkt_limit(stale=stale, changes=changes),
+        }
+        responses = dict(zip(
+            requests,
+            await asyncio.gather(*requests.values(), return_exceptions=True)
+        ))
+        errors = {}
+        for endpoint, response in responses.items():
+            if isinstance(response, BaseException):
+                if endpoint == EndPoint.API_CUMULATIVE_PRICE_URL or not isinstance(response, Exception):
+                    raise response
+                errors[endpoint.name] = str(response)
+        if EndPoint.API_MARKET_LIMITS_URL.name not in errors:
+            self._mkt_cap = responses[EndPoint.API_MARKET_LIMITS_URL]
+        mkt_limits = responses[EndPoint.API_ELEC_NEM_SUMMARY_URL]
+        if EndPoint.API_ELEC_NEM_SUMMARY_URL.name in errors:
+            mkt_limits = {}
+        results["degraded"] = bool(errors or stale)
+        results["errors"] = errors
+        results["stale"] = sorted(stale)
+        results["changes"] = [change.as_dict() for change in changes]
+        return responses[EndPoint.API_CUMULATIVE_PRICE_URL], mkt_limits
+
 
-    async def _get_mkt_limit_cap(self) -> dict[str, Any]:
+    async def _get_mkt_limit_cap(self, stale: set[str] = None) -> dict[str, Any]:
         """Get AEMO Data."""
         headers = {
             'Content_type': 'text/json',
             'accept': 'text/plain'
         }
         full_url = f'{BaseUrl.API}{EndPoint.API_MARKET_LIMITS_URL}'
-        response = await self._api_get(full_url, headers, None)
+        response = await self._api_get(full_url, headers, None, stale=stale)
         for key in response["NEM_DASHBOARD_MARKET_PRICE_LIMITS"]:
             if key["KEY"] == "AdministeredPriceCap":
                 self._ameo_mkt_limits["AdministeredPriceCap"] = key["VALUE"]
@@ -280,62 +585,193 @@ class AemoNemData:
                 self._ameo_mkt_limits["MarketPriceCap"] = key["VALUE"]
         return self._ameo_mkt_limits
 
-    async def _get_mkt_limit(self) -> dict[str, Any]:
-        """Get AEMO Data."""
+    async def _get_mkt_limit(
+            self,
+            revalidate: bool = False,
+            stale: set[str] = None,
+            changes: list[MarketChange] = None,
+        ) -> dict[str, Any]:
+        """Get AEMO Data.
+
+        Market changes are added to ``changes``, or kept pending for the next
+        results when it is None.
+        """
         headers = {
             'Content_type': 'text/json',
             'accept': 'text/plain'
         }
         full_url = f'{BaseUrl.API}{EndPoint.API_ELEC_NEM_SUMMARY_URL}'
-        response = await self._api_get(full_url, headers, None)
-        data_set ={}
-        for data in response["ELEC_NEM_SUMMARY"]:
-            data_set = data
-            data_set["INTERCONNECTORFLOWS"]=json.loads(data["INTERCONNECTORFLOWS"])
-            self._aemo_data_elec_nem_summary[data_set["REGIONID"]] = data_set
-        for data in response["ELEC_NEM_SUMMARY_MARKET_NOTICE"]:
-            data_set = data
-            self._aemo_data_elec_nem_summary_market_notice.append(data_set)
-            for data in response["ELEC_NEM_SUMMARY_PRICES"]:
-                data_set = data
-                self._aemo_data_elec_nem_summary_prices[data_set["REGIONID"]] = data_set
+        response = await self._api_get(full_url, headers, None, revalidate, stale)
+        with self._timer("parse_s", endpoint="ELEC_NEM_SUMMARY"):
+            (self._market_changes if changes is None else changes).extend(self._market_index.update(response))
+        if self._instrument is not None:
+            self._instrument("records", len(response["ELEC_NEM_SUMMARY"]), {"endpoint": "ELEC_NEM_SUMMARY"})
+        self._aemo_data_elec_nem_summary_market_notice = list(self._market_index.notices.values())
         return self._aemo_data_elec_nem_summary
 
     async def _api_post(self, url: str, headers: dict[str, Any], data ) -> dict[str, Any]:
         """Make POST API call."""
-        async with self._session.post(
-            url,
-            headers=headers,
-            data=data,
-            timeout=self._timeout
-            ) as resp:
-            return await self._api_response(resp)
+        response = await self._transport.request("POST", url, headers, data=data)
+        self._api_check_status(response.status, response.body)
+        return self._api_decode(response.body)
 
     async def _api_post_json(self, url: str, headers: dict[str, Any], data ) -> dict[str, Any]:
         """Make POST API call."""
-        async with self._session.post(
-            url,
-            headers=headers,
-            json=data,
-            timeout=self._timeout
-            ) as resp:
-            return await self._api_response(resp)
+        return await self._api_cached("POST", url, headers, json=data)
 
     async def _api_get(
             self,
             url: str,
             headers: dict[str, Any],
-            data: dict[str, Any]
+            data: dict[str, Any],
+            revalidate: bool = False,
+            stale: set[str] = None,
         ) -> dict[str, Any]:
         """Make GET API call."""
+        return await self._api_cached("GET", url, headers, revalidate, stale, data=data)
+
+    async def _api_cached(
+            self,
+            method: str,
+            url: str,
+            headers: dict[str, Any],
+            revalidate: bool = False,
+            stale: set[str] = None,
+            **kwargs
+        ) -> dict[str, Any]:
+        """Make API call through the response cache.
+
+        Fresh entries are served without a request unless ``revalidate`` is
+        set. Other entries are revalidated with If-None-Match/If-Modified-Since
+        where the server supplied an ETag or Last-Modified header. Concurrent
+        calls for the same request share one fetch.
+
+        When an expired entry exists and the fetch fails, or takes longer than
+        ``stale_timeout``, the entry is served and the endpoint is added to
+        ``stale``. A slow fetch carries on and updates the cache when it completes.
+        """
+        endpoint = self._endpoint(url)
+        name = url.rsplit('/', 1)[-1]
+        key = f'{method} {url} {json.dumps(kwargs, sort_keys=True)}'
+        now = datetime.now(timezone.utc)
+        entry = await self._cache.async_get(key) if endpoint else None
+        if entry is not None and entry.expires > now and not revalidate:
+            if self._instrument is not None:
+                self._instrument("cache_hit", 1, {"endpoint": name})
+            with self._timer("decode_s", endpoint=name):
+                return self._api_decode(entry.body)
+        # Decoded responses may be updated in place by the parsers, so only
+        # the caller that started a fetch gets its decoded response.
+        started = not self._scheduler.in_flight(key)
+        fetch = self._scheduler.coalesce(key, lambda: self._api_fetch(key, endpoint, name, entry, method, url, headers, **kwargs))
+        try:
+            if entry is not None and self._stale_timeout is not None:
+                body, response = await asyncio.wait_for(asyncio.shield(fetch), self._stale_timeout.total_seconds())
+            else:
+                body, response = await asyncio.shield(fetch)
+        except (ClientError, AiohttpClientError, asyncio.TimeoutError):
+            if entry is None:
+                raise
+            if stale is not None:
+                stale.add(name)
+            if self._instrument is not None:
+                self._instrument("stale_served", 1, {"endpoint": name})
+            body, started = entry.body, False
+        if started:
+            return response
+        with self._timer("decode_s", endpoint=name):
+            return self._api_decode(body)
+
+    async def _api_fetch(
+            self,
+            key: str,
+            endpoint: EndPoint | None,
+            name: str,
+            entry: CacheEntry | None,
+            method: str,
+            url: str,
+            headers: dict[str, Any],
+            **kwargs
+        ) -> tuple[bytes, dict[str, Any]]:
+        """Fetch a response through the scheduler, cache it and return its body and decoded form.
+
+        ``entry`` is the cache entry the caller found. The fetch waits for the
+        cache lease on key. If another worker has stored a different entry
+        by the time the lease is taken, or while waiting for it, that entry
+        is used instead.
+        """
+        token = None
+        if endpoint:
+            while True:
+                token = await self._cache.async_acquire(key, FETCH_LEASE)
+                shared = await self._cache.async_get(key)
+                if shared is not None and (entry is None or shared.expires != entry.expires):
+                    if token is not None:
+                        await self._cache.async_release(key, token)
+                    if self._instrument is not None:
+                        self._instrument("cache_shared", 1, {"endpoint": name})
+                    with self._timer("decode_s", endpoint=name):
+                        return shared.body, self._api_decode(shared.body)
+                if token is not None:
+                    break
+                await asyncio.sleep(LEASE_POLL_INTERVAL)
+            entry = shared
+        try:
+            return await self._api_fetch_origin(key, endpoint, name, entry, method, url, headers, **kwargs)
+        finally:
+            if token is not None:
+                await self._cache.async_release(key, token)
+
+    async def _api_fetch_origin(
+            self,
+            key: str,
+            endpoint: EndPoint | None,
+            name: str,
+            entry: CacheEntry | None,
+            method: str,
+            url: str,
+            headers: dict[str, Any],
+            **kwargs
+        ) -> tuple[bytes, dict[str, Any]]:
+        """Fetch a response from AEMO, revalidating entry, and store it in the cache."""
+        now = datetime.now(timezone.utc)
+        headers = dict(headers)
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        with self._timer("fetch_s", endpoint=name):
+            resp = await self._scheduler.request(self._transport, name, method, url, headers, **kwargs)
+        if entry is not None and resp.status == 304:
+            body = entry.body
+        else:
+            self._api_check_status(resp.status, resp.body)
+            body = resp.body
+        with self._timer("decode_s", endpoint=name):
+            response = self._api_decode(body)
+        if self._instrument is not None:
+            self._instrument("response_bytes", len(resp.body), {"endpoint": name})
+            self._instrument("cache_revalidated" if resp.status == 304 else "cache_miss", 1, {"endpoint": name})
+        if endpoint:
+            unchanged = entry is not None and entry.body == body
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+            await self._cache.async_set(key, CacheEntry(
+                body=body,
+                expires=self._cache.expires(endpoint, unchanged, now),
+                etag=etag or (entry.etag if unchanged else None),
+                last_modified=last_modified or (entry.last_modified if unchanged else None),
+            ))
+        return body, response
 
-        async with self._session.get(
-                url,
-                headers=headers,
-                data=data,
-                timeout=self._timeout
-            ) as resp:
-            return await self._api_response(resp)
+    @staticmethod
+    def _endpoint(url: str) -> EndPoint | None:
+        """Return the EndPoint for a full url."""
+        try:
+            return EndPoint(url.removeprefix(BaseUrl.API))
+        except ValueError:
+            return None
 
     async def _api_delete(
             self,
@@ -345,22 +781,22 @@ class AemoNemData:
         ) -> dict[str, Any]:
         """Make GET API call."""
 
-        async with self._session.delete(
-                url,
-                headers=headers,
-                data=data,
-                timeout=self._timeout
-            ) as resp:
-            return await self._api_response(resp)
+        response = await self._transport.request("DELETE", url, headers, data=data)
+        self._api_check_status(response.status, response.body)
+        return self._api_decode(response.body)
+
+    @staticmethod
+    def _api_check_status(status: int, body: bytes) -> None:
+        """Raise ClientError for a failed API call."""
+        if status != 200:
+            error = body.decode(errors='replace')
+            raise ClientError(f'API Error Encountered. Status: {status}; Error: {error}')
 
     @staticmethod
-    async def _api_response(resp: ClientResponse):
-        """Return response from API call."""
-        if resp.status != 200:
-            error = await resp.text()
-            raise ClientError(f'API Error Encountered. Status: {resp.status}; Error: {error}')
+    def _api_decode(body: bytes) -> dict[str, Any]:
+        """Decode and check a raw API response body."""
         try:
-            response: dict[str, Any] = await resp.json()
+            response: dict[str, Any] = json.loads(body)
         except Exception as error:
             raise ClientError(f'Could not return json {error}') from error
         if 'error' in response:
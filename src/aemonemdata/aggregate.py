@@ -0,0 +1,142 @@
+"""Vectorized 30 minute trading interval aggregation.
+
+``aggregate_30min`` bins the rows of a CumulPriceBlock into 30 minute
+trading intervals for every region in one pass and returns 2D arrays
+indexed by (region, interval). NumPy is required.
+"""
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from .columnar import CumulPriceBlock, np, to_datetime64
+from .constants import CUMULATIVE_PRICE_WINDOW, DISPATCH_INTERVAL, NEM_TIMEZONE
+from .interval_store import TRADING_INTERVAL, trading_interval_start
+
+PERIODS_PER_TRADING_INTERVAL = TRADING_INTERVAL // DISPATCH_INTERVAL
+
+_DISPATCH_SECONDS = int(DISPATCH_INTERVAL.total_seconds())
+_TRADING_SECONDS = int(TRADING_INTERVAL.total_seconds())
+# Spacing of the per-region sort keys, larger than any settlement time in seconds.
+_REGION_KEY = 1 << 40
+
+
+class TradingIntervals(NamedTuple):
+    """Per region and trading interval aggregates, prices in $/MWh.
+
+    Arrays other than ``start`` have one row per region and one column per
+    interval. Missing values are NaN, and ``count`` is the number of actual
+    dispatch intervals seen.
+    """
+
+    regions: list[str]
+    start: Any
+    count: Any
+    average: Any
+    forecast: Any
+    estimated: Any
+    cumulative: Any
+    rolling_sum: Any
+
+    def as_dicts(self, region_id: str) -> list[dict[str, Any]]:
+        """Return the intervals of a region as dicts, with prices in $/kW."""
+        row = self.regions.index(region_id)
+        results = []
+        for column, start in enumerate(self.start):
+            start_time = start.astype(datetime).replace(tzinfo=NEM_TIMEZONE)
+            results.append({
+                "start_time": start_time,
+                "end_time": start_time + TRADING_INTERVAL,
+                "periods": int(self.count[row, column]),
+                "average": _price_kw(self.average[row, column]),
+                "forecast": _price_kw(self.forecast[row, column]),
+                "estimated": _price_kw(self.estimated[row, column]),
+                "cumulative_price": _price_mw(self.cumulative[row, column]),
+                "rolling_sum": _price_mw(self.rolling_sum[row, column]),
+            })
+        return results
+
+
+def _price_kw(value: float) -> float | None:
+    """Return a $/MWh value as $/kW, or None for NaN."""
+    return None if np.isnan(value) else round(float(value)/1000,4)
+
+
+def _price_mw(value: float) -> float | None:
+    """Return a value as a float, or None for NaN."""
+    return None if np.isnan(value) else float(value)
+
+
+def aggregate_30min(
+        block: CumulPriceBlock,
+        start: datetime,
+        end: datetime,
+        cumulative_window: int = CUMULATIVE_PRICE_WINDOW,
+    ) -> TradingIntervals:
+    """Aggregate the trading intervals that start in [start, end) for all regions of a block.
+
+    For each region and interval this returns the number of actual dispatch
+    intervals and their average price, the 30 minute forecast, an estimate
+    that fills the missing dispatch intervals with the forecast, the last
+    cumulative price reported, and the sum of actual prices over the
+    ``cumulative_window`` dispatch intervals ending with the interval.
+    """
+    start64 = to_datetime64(trading_interval_start(start.astimezone(NEM_TIMEZONE)))
+    intervals = max(0, -(-int((to_datetime64(end) - start64).astype(int)) // _TRADING_SECONDS))
+    region_count = len(block.region_names)
+    cells = region_count * intervals
+    # Seconds since start of each row's period start.
+    offset = (block.settlement - start64).astype("timedelta64[s]").astype(np.int64)
+    period_offset = np.where(block.actual, offset - _DISPATCH_SECONDS, offset - _TRADING_SECONDS)
+    column = period_offset // _TRADING_SECONDS
+    in_span = (period_offset >= 0) & (column < intervals)
+    cell = block.region.astype(np.int64) * intervals + column
+
+    actual = in_span & block.actual
+    actual_cell = cell[actual]
+    count = np.bincount(actual_cell, minlength=cells)
+    price_sum = np.bincount(actual_cell, weights=block.price[actual], minlength=cells)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average = np.where(count > 0, price_sum / count, np.nan)
+
+    forecast = np.full(cells, np.nan)
+    forecast_rows = in_span & ~block.actual
+    forecast[cell[forecast_rows]] = block.price[forecast_rows]
+    estimated = np.where(
+        count >= PERIODS_PER_TRADING_INTERVAL,
+        average,
+        (price_sum + forecast * (PERIODS_PER_TRADING_INTERVAL - count)) / PERIODS_PER_TRADING_INTERVAL,
+    )
+
+    # The cumulative price of an interval is the one on its last actual row.
+    latest = np.full(cells, np.iinfo(np.int64).min)
+    np.maximum.at(latest, actual_cell, offset[actual])
+    is_latest = offset[actual] == latest[actual_cell]
+    cumulative = np.full(cells, np.nan)
+    cumulative[actual_cell[is_latest]] = block.cumulative[actual][is_latest]
+
+    rolling_sum = _rolling_sum(block, start64, intervals, cumulative_window)
+    shape = (region_count, intervals)
+    return TradingIntervals(
+        regions=list(block.region_names),
+        start=start64 + np.arange(intervals) * np.timedelta64(_TRADING_SECONDS, "s"),
+        count=count.reshape(shape),
+        average=average.reshape(shape),
+        forecast=forecast.reshape(shape),
+        estimated=estimated.reshape(shape),
+        cumulative=cumulative.reshape(shape),
+        rolling_sum=rolling_sum.reshape(shape),
+    )
+
+
+def _rolling_sum(block: CumulPriceBlock, start64, intervals: int, window: int):
+    """Return the sum of actual prices over window dispatch intervals up to each interval end."""
+    actual = block.actual
+    seconds = block.settlement[actual].astype("datetime64[s]").astype(np.int64)
+    keys = block.region[actual].astype(np.int64) * _REGION_KEY + seconds
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    running = np.concatenate(([0.0], np.cumsum(block.price[actual][order])))
+    interval_end = start64.astype(np.int64) + (np.arange(intervals) + 1) * _TRADING_SECONDS
+    query = np.arange(len(block.region_names))[:, None] * _REGION_KEY + interval_end[None, :]
+    upper = np.searchsorted(keys, query, side="right")
+    lower = np.searchsorted(keys, query - window * _DISPATCH_SECONDS, side="right")
+    return np.where(upper > lower, running[upper] - running[lower], np.nan)
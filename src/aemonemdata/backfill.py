@@ -0,0 +1,277 @@
+"""Backfill of historical 5MIN and cumulative price records to disk.
+
+A backfill splits a date range into chunks and fetches them concurrently,
+with at most ``concurrency`` chunks in flight and at most ``rate`` chunks
+started per second. The records of each chunk are written as JSON lines to
+``<directory>/<report>/<region>/<chunk start>.jsonl`` while they arrive, and
+the chunk is recorded in ``<directory>/checkpoint.json`` once all its files
+are in place. Running the same backfill again skips the recorded chunks.
+
+Records come from a chunk source. The default DashboardSource reads the
+dashboard reports, which only cover the history AEMO currently publishes on
+them. A source over another archive only has to yield (report, record)
+pairs for a chunk.
+
+A source with a ``covers(start, end)`` method is asked after each chunk
+whether its data spans the whole chunk. Chunks it does not cover, such as
+the current or future intervals and those older than the dashboard history,
+are written but not recorded, so the next run fetches them again. The
+checkpoint also records the source, and resuming with a different one is
+refused.
+"""
+import asyncio
+import json
+import os
+import time
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from .aemonem import AemoNemData
+from .constants import NEM_TIMEZONE, REGIONS
+from .records import PriceInterval, parse_5min_record
+
+ChunkSource = Callable[[AemoNemData, datetime, datetime, list[str]], AsyncIterator[tuple[str, dict[str, Any]]]]
+
+# Settlement date field, period type field and actual value of each report.
+_ACTUAL_FIELDS = {
+    "5MIN": ("SETTLEMENTDATE", "PERIODTYPE", "ACTUAL"),
+    "NEM_DASHBOARD_CUMUL_PRICE": ("DT", "A", 1),
+}
+
+DEFAULT_CHUNK = timedelta(days=1)
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+class DashboardSource:
+    """Chunk source over the 5MIN and NEM_DASHBOARD_CUMUL_PRICE reports.
+
+    Each report is fetched once per source and shared by every chunk. Only
+    actual intervals with a settlement date in the chunk are yielded, parsed
+    the same way as by ``get_data`` and the cumulative price feed.
+    """
+
+    def __init__(self):
+        self._fetches: dict[str, asyncio.Task] = {}
+        self._spans: dict[str, tuple[datetime, datetime] | None] = {}
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """Return whether every report fetched holds actuals settled from start to end."""
+        return bool(self._spans) and all(
+            span is not None and span[0] <= start and end <= span[1]
+            for span in self._spans.values()
+        )
+
+    async def __call__(
+            self,
+            client: AemoNemData,
+            start: datetime,
+            end: datetime,
+            regions: list[str],
+        ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        for record in await self._fetch(client, "5MIN", client.get_5min_records):
+            if record['REGIONID'] in regions and record['PERIODTYPE'] == 'ACTUAL':
+                record = parse_5min_record(record)
+                if start <= record['SETTLEMENTDATE'] < end:
+                    yield "5MIN", record
+        for record in await self._fetch(client, "NEM_DASHBOARD_CUMUL_PRICE", client.get_cumulative_price_records):
+            if record["R"] in regions and record["A"] == 1:
+                interval = PriceInterval.from_cumul_price(record)
+                if start <= interval.settlement_date < end:
+                    yield "NEM_DASHBOARD_CUMUL_PRICE", interval.as_dict()
+
+    async def _fetch(self, client: AemoNemData, report: str, fetch: Callable) -> list[dict[str, Any]]:
+        """Return the records of a report, fetching them on first use."""
+        if report not in self._fetches:
+            self._fetches[report] = asyncio.ensure_future(fetch())
+        fetch_task = self._fetches[report]
+        try:
+            records = await asyncio.shield(fetch_task)
+        except Exception:
+            if self._fetches.get(report) is fetch_task:
+                del self._fetches[report]
+            raise
+        if report not in self._spans:
+            date_field, type_field, actual = _ACTUAL_FIELDS[report]
+            dates = [record[date_field] for record in records if record[type_field] == actual]
+            # AEMO dates are ISO strings in NEM time, so they sort as strings.
+            self._spans[report] = (
+                (_nem_datetime(min(dates)), _nem_datetime(max(dates))) if dates else None
+            )
+        # Copy the records as the 5MIN parser updates them in place.
+        return [dict(record) for record in records]
+
+
+class _RateLimiter:
+    """Space out calls to wait() to at most rate per second."""
+
+    def __init__(self, rate: float):
+        self._interval = 1 / rate if rate else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait for the next free slot."""
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self._interval
+
+
+def _nem_datetime(value: str) -> datetime:
+    """Parse an AEMO date string in NEM time."""
+    return datetime.fromisoformat(value).replace(tzinfo=NEM_TIMEZONE)
+
+
+def _source_name(source: ChunkSource) -> str:
+    """Return the name a source is recorded under in the checkpoint."""
+    named = source if hasattr(source, "__qualname__") else type(source)
+    return f'{named.__module__}.{named.__qualname__}'
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the datetimes of parsed records."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class Backfill:
+    """Fetch records for a date range and regions to a directory.
+
+    ``start`` and ``end`` are treated as NEM time when they have no time
+    zone. ``regions`` are the keys of ``REGIONS`` and default to all of them.
+    A ``rate`` of 0 disables the rate limit.
+    """
+
+    def __init__(
+            self,
+            client: AemoNemData,
+            start: datetime,
+            end: datetime,
+            directory: str | Path,
+            regions: list[str] = None,
+            chunk: timedelta = DEFAULT_CHUNK,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            rate: float = DEFAULT_RATE,
+            source: ChunkSource = None,
+        ):
+        if chunk <= timedelta(0):
+            raise ValueError('chunk must be positive')
+        self._client = client
+        self._start = start if start.tzinfo else start.replace(tzinfo=NEM_TIMEZONE)
+        self._end = end if end.tzinfo else end.replace(tzinfo=NEM_TIMEZONE)
+        self._directory = Path(directory)
+        self._regions = sorted(REGIONS[region.lower()] for region in (regions or REGIONS))
+        self._chunk = chunk
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rate_limiter = _RateLimiter(rate)
+        self._source = source or DashboardSource()
+        self._source_name = _source_name(self._source)
+        self._completed: set[str] = set()
+
+    def chunks(self) -> list[tuple[datetime, datetime]]:
+        """Return the (start, end) of every chunk in the range."""
+        chunks = []
+        chunk_start = self._start
+        while chunk_start < self._end:
+            chunk_end = min(chunk_start + self._chunk, self._end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+        return chunks
+
+    async def run(self) -> dict[str, Any]:
+        """Fetch every chunk not in the checkpoint.
+
+        Returns the number of chunks completed and skipped, the number
+        written but not yet covered by the source, and the error of each
+        chunk that failed keyed by its start. Failed chunks leave no files
+        behind. Failed and incomplete chunks are fetched again by the next
+        run.
+        """
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._completed = self._load_checkpoint()
+        pending = [chunk for chunk in self.chunks() if self._key(chunk[0]) not in self._completed]
+        results = await asyncio.gather(*(self._run_chunk(*chunk) for chunk in pending), return_exceptions=True)
+        errors = {}
+        for (chunk_start, _), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                errors[self._key(chunk_start)] = str(result)
+        completed = sum(result is True for result in results)
+        return {
+            "completed": completed,
+            "incomplete": len(pending) - completed - len(errors),
+            "skipped": len(self.chunks()) - len(pending),
+            "errors": errors,
+        }
+
+    async def _run_chunk(self, start: datetime, end: datetime) -> bool:
+        """Stream the records of one chunk to its files and return whether it was checkpointed."""
+        async with self._semaphore:
+            await self._rate_limiter.wait()
+            key = self._key(start)
+            files = {}
+            try:
+                async for report, record in self._source(self._client, start, end, self._regions):
+                    region_id = record.get("REGIONID", record.get("region_id"))
+                    output = files.get((report, region_id))
+                    if output is None:
+                        path = self._directory / report / region_id / f'{key}.jsonl.part'
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        output = files[(report, region_id)] = path.open('w', encoding='utf-8')
+                    output.write(json.dumps(record, default=_json_default))
+                    output.write('\n')
+            except BaseException:
+                for output in files.values():
+                    output.close()
+                    os.unlink(output.name)
+                raise
+            for output in files.values():
+                output.close()
+                os.replace(output.name, output.name.removesuffix('.part'))
+            covers = getattr(self._source, "covers", None)
+            if covers is not None and not covers(start, end):
+                return False
+            self._completed.add(key)
+            self._save_checkpoint()
+            return True
+
+    def _key(self, start: datetime) -> str:
+        """Return the checkpoint key and file name of a chunk."""
+        return start.astimezone(NEM_TIMEZONE).strftime('%Y%m%dT%H%M')
+
+    def _load_checkpoint(self) -> set[str]:
+        """Return the chunks recorded in the checkpoint."""
+        path = self._directory / CHECKPOINT_FILE
+        if not path.exists():
+            return set()
+        checkpoint = json.loads(path.read_text(encoding='utf-8'))
+        if (
+                checkpoint["regions"] != self._regions
+                or checkpoint["chunk"] != self._chunk.total_seconds()
+                or checkpoint.get("source") != self._source_name
+            ):
+            raise ValueError(
+                f'Checkpoint in {self._directory} was written for regions {checkpoint["regions"]}, '
+                f'{checkpoint["chunk"]}s chunks and source {checkpoint.get("source")}'
+            )
+        return set(checkpoint["completed"])
+
+    def _save_checkpoint(self) -> None:
+        """Write the checkpoint atomically."""
+        path = self._directory / CHECKPOINT_FILE
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps({
+            "regions": self._regions,
+            "chunk": self._chunk.total_seconds(),
+            "source": self._source_name,
+            "completed": sorted(self._completed),
+        }), encoding='utf-8')
+        os.replace(temp_path, path)
@@ -0,0 +1,251 @@
+"""Offline benchmarks for the AemoNemData parsing pipeline.
+
+Run with ``python -m aemonemdata.benchmark``. Every benchmark runs against
+synthetic payloads served by a ReplayTransport, so no network is needed.
+The ``bench_*`` functions return plain dicts of measurements and can be
+wrapped by pytest-benchmark or any other harness.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .aemonem import AemoNemData
+from .aggregate import aggregate_30min
+from .cache import ResponseCache
+from .columnar import HAS_NUMPY, CumulPriceBlock
+from .constants import EndPoint, NEM_TIMEZONE, REGIONS
+from .interval_store import IntervalStore
+from .instrumentation import Stats
+from .records import PriceInterval
+from .transport import ReplayTransport
+
+FORECAST_PERIODS = 16
+
+
+def generate_payloads(
+        intervals: int = 288,
+        regions: int = len(REGIONS),
+        now: datetime = None,
+    ) -> dict[EndPoint, dict[str, Any]]:
+    """Return synthetic payloads for all four endpoints.
+
+    Each region gets ``intervals`` 5 minute actuals ending at the current
+    dispatch interval and FORECAST_PERIODS 30 minute forecasts.
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(NEM_TIMEZONE).replace(tzinfo=None)
+    latest = now - timedelta(minutes=now.minute % 5, seconds=now.second, microseconds=now.microsecond)
+    first_forecast = latest - timedelta(minutes=latest.minute % 30) + timedelta(minutes=30)
+    region_ids = list(REGIONS.values())[:regions]
+    cumul_price = []
+    five_min = []
+    summary = []
+    for index, region_id in enumerate(region_ids):
+        cumulative_price = 0.0
+        for interval in range(intervals - 1, -1, -1):
+            settlement_date = (latest - timedelta(minutes=5 * interval)).isoformat()
+            price = 50.0 + index * 10 + interval % 7
+            cumulative_price += price
+            cumul_price.append({"DT": settlement_date, "R": region_id, "P": price, "CP": cumulative_price, "A": 1})
+            five_min.append({
+                "SETTLEMENTDATE": settlement_date, "REGIONID": region_id, "RRP": price,
+                "TOTALDEMAND": 5000.0, "PERIODTYPE": "ACTUAL",
+            })
+        for interval in range(FORECAST_PERIODS):
+            settlement_date = (first_forecast + timedelta(minutes=30 * interval)).isoformat()
+            price = 70.0 + interval
+            cumul_price.append({"DT": settlement_date, "R": region_id, "P": price, "CP": 0.0, "A": 0})
+            five_min.append({
+                "SETTLEMENTDATE": settlement_date, "REGIONID": region_id, "RRP": price,
+                "TOTALDEMAND": 5000.0, "PERIODTYPE": "FORECAST",
+            })
+        summary.append({
+            "SETTLEMENTDATE": latest.isoformat(), "REGIONID": region_id, "PRICE": 55.0,
+            "TOTALDEMAND": 5000.0, "NETINTERCHANGE": 10.0, "SCHEDULEDGENERATION": 4000.0,
+            "SEMISCHEDULEDGENERATION": 1000.0, "APCFLAG": 0, "MARKETSUSPENDEDFLAG": 0,
+            "INTERCONNECTORFLOWS": json.dumps([{
+                "name": f"{region_id}-INTERCONNECTOR", "value": 100.0,
+                "exportlimit": 500.0, "importlimit": -500.0,
+            }]),
+        })
+    return {
+        EndPoint.API_CUMULATIVE_PRICE_URL: {"NEM_DASHBOARD_CUMUL_PRICE": cumul_price},
+        EndPoint.API_ELEC_NEM_SUMMARY_URL: {
+            "ELEC_NEM_SUMMARY": summary,
+            "ELEC_NEM_SUMMARY_PRICES": [{"REGIONID": region_id, "RRP": 55.0} for region_id in region_ids],
+            "ELEC_NEM_SUMMARY_MARKET_NOTICE": [],
+        },
+        EndPoint.API_MARKET_LIMITS_URL: {"NEM_DASHBOARD_MARKET_PRICE_LIMITS": [
+            {"KEY": "MarketPriceCap", "VALUE": 17500},
+            {"KEY": "AdministeredPriceCap", "VALUE": 600},
+            {"KEY": "CumulativePriceThreshold", "VALUE": 1573700},
+        ]},
+        EndPoint.API_5MIN_URL: {"5MIN": five_min},
+    }
+
+
+def _no_cache() -> ResponseCache:
+    """Return a cache that expires every entry immediately."""
+    return ResponseCache(ttl={endpoint: timedelta(0) for endpoint in EndPoint})
+
+
+def _measure(function: Callable[[], Any], rounds: int) -> dict[str, float]:
+    """Time function over rounds, then measure the allocations of one call."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "min_s": timings[0],
+        "median_s": timings[len(timings) // 2],
+        "retained_bytes": current,
+        "peak_bytes": peak,
+    }
+
+
+def bench_get_aemo_data(intervals: int, regions: int, rounds: int = 20, warm: bool = False) -> dict[str, float]:
+    """Benchmark get_aemo_data end to end over a ReplayTransport.
+
+    A cold run uses a new AemoNemData per call, so the whole payload is
+    ingested. A warm run reuses one instance, so only the delta is merged.
+    Besides the timings, the result has the regions returned, the requests
+    made and the regions changed in the interval store by the last call.
+    """
+    payloads = generate_payloads(intervals, regions)
+    states = list(REGIONS)[:regions]
+    loop = asyncio.new_event_loop()
+    transport = ReplayTransport(payloads)
+    stats = Stats()
+    client = AemoNemData(transport=transport, cache=_no_cache(), instrumentation=stats)
+    results = {}
+
+    def run() -> None:
+        instance = client if warm else AemoNemData(transport=transport, cache=_no_cache(), instrumentation=stats)
+        results.update(loop.run_until_complete(instance.get_aemo_data(states)))
+
+    try:
+        run()
+        result = _measure(run, rounds)
+        stats.reset()
+        transport.calls.clear()
+        run()
+    finally:
+        loop.close()
+    result["regions"] = len(results["current_30min_forecast"])
+    result["requests"] = len(transport.calls)
+    result["regions_changed"] = stats.total("regions_changed")
+    return result
+
+
+def _merge(records: list[dict[str, Any]]) -> IntervalStore:
+    """Return a new IntervalStore with records merged."""
+    store = IntervalStore()
+    store.merge_cumul_price(records)
+    return store
+
+
+def bench_parse(intervals: int, regions: int, rounds: int = 20) -> dict[str, dict[str, float]]:
+    """Benchmark each cumulative price parser, reporting time per 1k records.
+
+    ``parsed`` is the length of the parser output, which for the interval
+    store is the number of actual intervals kept.
+    """
+    records = generate_payloads(intervals, regions)[EndPoint.API_CUMULATIVE_PRICE_URL]["NEM_DASHBOARD_CUMUL_PRICE"]
+    parsers = {
+        "records": lambda: [PriceInterval.from_cumul_price(record) for record in records],
+        "interval_store": lambda: _merge(records),
+    }
+    if HAS_NUMPY:
+        parsers["columnar"] = lambda: CumulPriceBlock(records)
+    results = {}
+    for name, parser in parsers.items():
+        result = _measure(parser, rounds)
+        result["per_1k_records_s"] = result["median_s"] / len(records) * 1000
+        result["parsed"] = len(parser())
+        results[name] = result
+    return results
+
+
+def bench_aggregate(intervals: int, regions: int, rounds: int = 20) -> dict[str, float] | None:
+    """Benchmark aggregate_30min over every trading interval of the payload.
+
+    ``periods`` is the number of actual dispatch intervals aggregated.
+    """
+    if not HAS_NUMPY:
+        return None
+    now = datetime.now(timezone.utc)
+    records = generate_payloads(intervals, regions, now)[EndPoint.API_CUMULATIVE_PRICE_URL]["NEM_DASHBOARD_CUMUL_PRICE"]
+    block = CumulPriceBlock(records)
+    start = now - timedelta(minutes=5 * intervals)
+    result = _measure(lambda: aggregate_30min(block, start, now), rounds)
+    result["per_1k_records_s"] = result["median_s"] / len(records) * 1000
+    result["periods"] = int(aggregate_30min(block, start, now).count.sum())
+    return result
+
+
+IMPORT_STATEMENTS = {
+    "import aemonemdata": "import aemonemdata",
+    "import aemonemdata.core": "import aemonemdata.core",
+    "import AemoNemData": "from aemonemdata import AemoNemData",
+}
+
+
+def bench_import(statement: str, rounds: int = 10) -> dict[str, float]:
+    """Time a cold import statement, each round in a new interpreter."""
+    code = f'import time\nstart = time.perf_counter()\n{statement}\nprint(time.perf_counter() - start)'
+    timings = sorted(
+        float(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout)
+        for _ in range(rounds)
+    )
+    return {"min_s": timings[0], "median_s": timings[len(timings) // 2]}
+
+
+def main(argv: list[str] = None) -> None:
+    """Run the benchmarks and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--intervals", type=int, nargs="+", default=[288, 2016])
+    parser.add_argument("--regions", type=int, nargs="+", default=[1, len(REGIONS)])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--imports", action="store_true", help="only time cold imports")
+    args = parser.parse_args(argv)
+    if args.imports:
+        print(f'{"statement":<28}{"min ms":>12}{"median ms":>12}')
+        for name, statement in IMPORT_STATEMENTS.items():
+            result = bench_import(statement, args.rounds)
+            print(f'{name:<28}{result["min_s"] * 1000:>12.3f}{result["median_s"] * 1000:>12.3f}')
+        return
+    print(f'{"benchmark":<28}{"intervals":>10}{"regions":>8}{"median ms":>12}{"per 1k ms":>11}{"peak KiB":>10}')
+    for intervals in args.intervals:
+        for regions in args.regions:
+            rows = {
+                "get_aemo_data cold": bench_get_aemo_data(intervals, regions, args.rounds),
+                "get_aemo_data warm": bench_get_aemo_data(intervals, regions, args.rounds, warm=True),
+            }
+            for name, result in bench_parse(intervals, regions, args.rounds).items():
+                rows[f"parse {name}"] = result
+            aggregate = bench_aggregate(intervals, regions, args.rounds)
+            if aggregate is not None:
+                rows["aggregate 30min"] = aggregate
+            for name, result in rows.items():
+                per_1k = result.get("per_1k_records_s")
+                per_1k = f'{per_1k * 1000:>11.3f}' if per_1k is not None else f'{"":>11}'
+                print(
+                    f'{name:<28}{intervals:>10}{regions:>8}{result["median_s"] * 1000:>12.3f}'
+                    f'{per_1k}{result["peak_bytes"] / 1024:>10.0f}'
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Response cache aligned to the AEMO dispatch cadence."""
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from .utils import next_publish_time
+
+from .constants import (
+    EndPoint,
+    CACHE_TTL,
+    CACHE_REVALIDATE_INTERVAL,
+    DISPATCH_INTERVAL,
+    DISPATCH_PUBLISH_OFFSET,
+)
+
+
+@dataclass
+class CacheEntry:
+    """Raw response body with its validators and expiry."""
+
+    body: bytes
+    expires: datetime
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def encode(self) -> bytes:
+        """Return the entry as bytes for a shared store."""
+        header = json.dumps({
+            "expires": self.expires.timestamp(),
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        })
+        return header.encode() + b'\n' + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CacheEntry":
+        """Create from the bytes returned by encode."""
+        header, body = data.split(b'\n', 1)
+        header = json.loads(header)
+        return cls(
+            body=body,
+            expires=datetime.fromtimestamp(header["expires"], timezone.utc),
+            etag=header["etag"],
+            last_modified=header["last_modified"],
+        )
+
+
+class BaseResponseCache:
+    """Cache of raw API responses aligned to the AEMO dispatch cadence.
+
+    Endpoints with a TTL of one dispatch interval expire at the next dispatch
+    boundary plus ``publish_offset``, which gives AEMO time to publish the new
+    interval. Shorter TTLs expire at whichever comes first. Longer TTLs, such
+    as the one for the market price caps, expire after the TTL.
+
+    AemoNemData uses the ``async_`` methods, which subclasses implement.
+    Before fetching an expired entry it takes a lease on the key with
+    ``async_acquire``. The default grants every lease, as concurrent fetches
+    in one process are already shared. Shared backends grant one lease per
+    key at a time, so one worker fetches each response and the others wait
+    for it to be stored.
+    """
+
+    def __init__(
+            self,
+            ttl: dict[EndPoint, timedelta] | None = None,
+            publish_offset: timedelta = DISPATCH_PUBLISH_OFFSET,
+            revalidate_interval: timedelta = CACHE_REVALIDATE_INTERVAL,
+        ):
+        self._ttl = dict(CACHE_TTL)
+        if ttl:
+            self._ttl.update(ttl)
+        self._publish_offset = publish_offset
+        self._revalidate_interval = revalidate_interval
+
+    async def async_get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key, expired or not."""
+        raise NotImplementedError
+
+    async def async_set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry."""
+        raise NotImplementedError
+
+    async def async_clear(self) -> None:
+        """Drop all entries and leases."""
+        raise NotImplementedError
+
+    async def async_acquire(self, key: str, lease: timedelta) -> str | None:
+        """Take the lease to fetch key and return its token, or None if another worker holds it."""
+        return uuid.uuid4().hex
+
+    async def async_release(self, key: str, token: str) -> None:
+        """Give up a lease taken with async_acquire."""
+
+    async def async_close(self) -> None:
+        """Release any resources held by the cache."""
+
+    def expires(self, endpoint: EndPoint, unchanged: bool = False, now: datetime | None = None) -> datetime:
+        """Return the expiry time for a response fetched now.
+
+        ``unchanged`` marks a response that matched the previous entry. For
+        dispatch aligned endpoints that means AEMO has not published the new
+        interval yet, so it is revalidated again shortly.
+        """
+        now = now if now is not None else datetime.now(timezone.utc)
+        ttl = self._ttl.get(endpoint, DISPATCH_INTERVAL)
+        if ttl > DISPATCH_INTERVAL:
+            return now + ttl
+        if unchanged:
+            return now + min(ttl, self._revalidate_interval)
+        publish_time = next_publish_time(now, self._publish_offset)
+        if ttl == DISPATCH_INTERVAL:
+            return publish_time
+        return min(now + ttl, publish_time)
+
+
+class ResponseCache(BaseResponseCache):
+    """In-memory response cache with synchronous access as well.
+
+    The ``async_`` methods call ``get``, ``set`` and ``clear``, so
+    subclasses over a local store only implement those.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._entries: dict[str, CacheEntry] = {}
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key, expired or not."""
+        return self._entries.get(key)
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry."""
+        self._entries[key] = entry
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    async def async_get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key, expired or not."""
+        return self.get(key)
+
+    async def async_set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry."""
+        self.set(key, entry)
+
+    async def async_clear(self) -> None:
+        """Drop all entries and leases."""
+        self.clear()
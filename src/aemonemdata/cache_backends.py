@@ -0,0 +1,335 @@
+"""Response caches shared between worker processes.
+
+SqliteResponseCache shares entries between the processes of one host
+through a SQLite file. RedisResponseCache shares them between hosts through
+any server speaking the Redis protocol (RESP), using only GET, SET, DEL and
+SCAN. ``start_resp_server`` runs a small in-process stand-in for such a
+server.
+"""
+import asyncio
+import fnmatch
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from .cache import BaseResponseCache, CacheEntry
+from .constants import SHARED_CACHE_RETENTION, SHARED_CACHE_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SqliteResponseCache(BaseResponseCache):
+    """Response cache in a SQLite file shared by the processes of one host.
+
+    Only the ``async_`` methods are available. Each runs its statements in a
+    worker thread, so waiting for another process's write lock does not
+    block the event loop.
+    """
+
+    def __init__(self, path: str | Path, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, data BLOB NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL)'
+        )
+
+    def _execute(self, *statements: tuple[str, tuple]) -> list[tuple]:
+        """Run statements and return the rows of the last one."""
+        with self._lock:
+            rows = []
+            for sql, parameters in statements:
+                rows = self._connection.execute(sql, parameters).fetchall()
+            return rows
+
+    async def async_get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key, expired or not."""
+        rows = await asyncio.to_thread(self._execute, ('SELECT data FROM entries WHERE key = ?', (key,)))
+        return CacheEntry.decode(rows[0][0]) if rows else None
+
+    async def async_set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry."""
+        await asyncio.to_thread(
+            self._execute,
+            ('INSERT OR REPLACE INTO entries (key, data) VALUES (?, ?)', (key, entry.encode())),
+        )
+
+    async def async_clear(self) -> None:
+        """Drop all entries and leases."""
+        await asyncio.to_thread(self._execute, ('DELETE FROM entries', ()), ('DELETE FROM leases', ()))
+
+    async def async_acquire(self, key: str, lease: timedelta) -> str | None:
+        """Take the lease to fetch key and return its token, or None if another worker holds it."""
+        token = uuid.uuid4().hex
+        owner = await asyncio.to_thread(self._acquire, key, token, lease)
+        return token if owner == token else None
+
+    def _acquire(self, key: str, token: str, lease: timedelta) -> str:
+        """Insert a lease unless an unexpired one exists and return the token holding it."""
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute('DELETE FROM leases WHERE key = ? AND expires <= ?', (key, now))
+                connection.execute(
+                    'INSERT OR IGNORE INTO leases (key, token, expires) VALUES (?, ?, ?)',
+                    (key, token, now + lease.total_seconds()),
+                )
+                owner = connection.execute('SELECT token FROM leases WHERE key = ?', (key,)).fetchone()[0]
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        return owner
+
+    async def async_release(self, key: str, token: str) -> None:
+        """Give up a lease taken with async_acquire."""
+        await asyncio.to_thread(self._execute, ('DELETE FROM leases WHERE key = ? AND token = ?', (key, token)))
+
+    async def async_close(self) -> None:
+        """Close the database."""
+        await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._connection.close()
+
+
+class RespClient:
+    """Minimal asyncio client for the Redis serialization protocol.
+
+    Commands are sent one at a time over a single connection, which is
+    opened on first use and again after an error. Connecting and each
+    command raise asyncio.TimeoutError after ``timeout`` seconds.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 6379, timeout: float = SHARED_CACHE_TIMEOUT):
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def execute(self, *args: str | bytes | int) -> Any:
+        """Send a command and return its reply."""
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    self._reader, self._writer = await asyncio.wait_for(
+                        asyncio.open_connection(self._host, self._port), self._timeout
+                    )
+                return await asyncio.wait_for(self._exchange(args), self._timeout)
+            except BaseException:
+                # A late reply would be read as the reply to the next command.
+                self._close()
+                raise
+
+    async def _exchange(self, args: tuple) -> Any:
+        """Write a command and read its reply."""
+        self._writer.write(_encode_command(args))
+        await self._writer.drain()
+        return await _read_reply(self._reader)
+
+    async def close(self) -> None:
+        """Close the connection."""
+        async with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        """Drop the connection."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+class RespError(Exception):
+    """Error reply from a RESP server."""
+
+
+# Errors after which the shared cache is treated as unavailable.
+_UNAVAILABLE = (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, RespError)
+
+
+def _encode_command(args: tuple) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP reply."""
+    line = await reader.readuntil(b'\r\n')
+    kind, value = line[:1], line[1:-2]
+    if kind == b'+':
+        return value.decode()
+    if kind == b'-':
+        raise RespError(value.decode())
+    if kind == b':':
+        return int(value)
+    if kind == b'$':
+        length = int(value)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b'*':
+        length = int(value)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RespError(f'Unknown reply {line!r}')
+
+
+class RedisResponseCache(BaseResponseCache):
+    """Response cache on a Redis protocol server shared by many hosts.
+
+    Only the ``async_`` methods are available. Entries are kept for
+    SHARED_CACHE_RETENTION so they can still be served stale. Leases are
+    keys set with NX and an expiry. When the server cannot be reached or
+    does not reply within ``timeout`` seconds the cache acts as empty and
+    every lease is granted, so workers fall back to fetching for themselves.
+    """
+
+    def __init__(
+            self,
+            host: str = 'localhost',
+            port: int = 6379,
+            prefix: str = 'aemonemdata:',
+            client: RespClient = None,
+            timeout: float = SHARED_CACHE_TIMEOUT,
+            **kwargs
+        ):
+        super().__init__(**kwargs)
+        self._client = client if client is not None else RespClient(host, port, timeout)
+        self._prefix = prefix
+
+    async def _execute(self, *args: str | bytes | int) -> Any:
+        """Run a command, logging and returning None if the server is unavailable."""
+        try:
+            return await self._client.execute(*args)
+        except _UNAVAILABLE as error:
+            _LOGGER.warning("Shared cache unavailable: %r", error)
+            return None
+
+    async def async_get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key, expired or not."""
+        data = await self._execute('GET', f'{self._prefix}entry:{key}')
+        return CacheEntry.decode(data) if data is not None else None
+
+    async def async_set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry."""
+        await self._execute(
+            'SET', f'{self._prefix}entry:{key}', entry.encode(),
+            'PX', int(SHARED_CACHE_RETENTION.total_seconds() * 1000),
+        )
+
+    async def async_clear(self) -> None:
+        """Drop all entries and leases under the prefix."""
+        cursor = '0'
+        while True:
+            reply = await self._execute('SCAN', cursor, 'MATCH', f'{self._prefix}*', 'COUNT', 1000)
+            if reply is None:
+                return
+            cursor, keys = reply[0].decode(), reply[1]
+            if keys:
+                await self._execute('DEL', *keys)
+            if cursor == '0':
+                return
+
+    async def async_acquire(self, key: str, lease: timedelta) -> str | None:
+        """Take the lease to fetch key and return its token, or None if another worker holds it."""
+        token = uuid.uuid4().hex
+        try:
+            reply = await self._client.execute(
+                'SET', f'{self._prefix}lease:{key}', token, 'NX', 'PX', int(lease.total_seconds() * 1000),
+            )
+        except _UNAVAILABLE as error:
+            _LOGGER.warning("Shared cache unavailable: %r", error)
+            return token
+        return token if reply == 'OK' else None
+
+    async def async_release(self, key: str, token: str) -> None:
+        """Give up a lease taken with async_acquire."""
+        lease_key = f'{self._prefix}lease:{key}'
+        # The lease expires by itself if it is taken over between these calls.
+        if await self._execute('GET', lease_key) == token.encode():
+            await self._execute('DEL', lease_key)
+
+    async def async_close(self) -> None:
+        """Close the connection."""
+        await self._client.close()
+
+
+async def start_resp_server(host: str = '127.0.0.1', port: int = 0) -> asyncio.Server:
+    """Start an in-memory RESP server supporting PING, GET, SET (with NX, PX and EX), DEL and SCAN.
+
+    It stands in for a Redis server in tests. The bound port is
+    ``server.sockets[0].getsockname()[1]``.
+    """
+    data: dict[bytes, tuple[bytes, float | None]] = {}
+
+    def lookup(key: bytes) -> bytes | None:
+        value = data.get(key)
+        if value is None:
+            return None
+        if value[1] is not None and value[1] <= time.monotonic():
+            del data[key]
+            return None
+        return value[0]
+
+    def run(command: list[bytes]) -> bytes:
+        name = command[0].upper()
+        if name == b'PING':
+            return b'+PONG\r\n'
+        if name == b'GET':
+            value = lookup(command[1])
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+        if name == b'SET':
+            key, value, options = command[1], command[2], [option.upper() for option in command[3:]]
+            expires = None
+            if b'PX' in options:
+                expires = time.monotonic() + int(command[3 + options.index(b'PX') + 1]) / 1000
+            elif b'EX' in options:
+                expires = time.monotonic() + int(command[3 + options.index(b'EX') + 1])
+            if b'NX' in options and lookup(key) is not None:
+                return b'$-1\r\n'
+            data[key] = (value, expires)
+            return b'+OK\r\n'
+        if name == b'DEL':
+            return b':%d\r\n' % sum(1 for key in command[1:] if lookup(key) is not None and data.pop(key))
+        if name == b'SCAN':
+            # Every key is returned in one batch, with a cursor of 0.
+            options = [option.upper() for option in command[2:]]
+            pattern = command[2 + options.index(b'MATCH') + 1].decode() if b'MATCH' in options else '*'
+            keys = [key for key in list(data) if lookup(key) is not None and fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b'*2\r\n$1\r\n0\r\n' + _encode_command(tuple(keys))
+        return b'-ERR unknown command\r\n'
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                command = await _read_reply(reader)
+                writer.write(run(command))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,127 @@
+"""Columnar representation of the NEM_DASHBOARD_CUMUL_PRICE payload.
+
+NumPy is optional. ``HAS_NUMPY`` is False when it is not installed and
+AemoNemData falls back to the per-record dict parser.
+"""
+from datetime import datetime, timedelta
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .constants import NEM_TIMEZONE
+from .records import PriceInterval, RegionView
+
+HAS_NUMPY = np is not None
+
+_CUMUL_PRICE_DTYPE = [
+    ("DT", "datetime64[s]"),
+    ("R", "U8"),
+    ("P", "f8"),
+    ("CP", "f8"),
+    ("A", "i1"),
+]
+
+
+def to_datetime64(value: datetime):
+    """Convert an aware datetime to naive NEM time datetime64."""
+    return np.datetime64(value.astimezone(NEM_TIMEZONE).replace(tzinfo=None), "s")
+
+
+def price_interval(region_id: str, actual: bool, settlement, price: float, cumulative: float) -> PriceInterval:
+    """Build a PriceInterval from NumPy column values."""
+    settlement_date = settlement.astype(datetime).replace(tzinfo=NEM_TIMEZONE)
+    if actual:
+        period_type = "actual"
+        period_start_date = settlement_date - timedelta(minutes=5)
+    else:
+        period_type = "forecast"
+        period_start_date = settlement_date - timedelta(minutes=30)
+    price = float(price)
+    return PriceInterval(
+        period_type=period_type,
+        settlement_date=settlement_date,
+        period_start_date=period_start_date,
+        region_id=region_id,
+        price_mw=price,
+        price_kw=round(price/1000,4),
+        cumulative_price=float(cumulative),
+    )
+
+
+class CumulPriceBlock:
+    """NEM_DASHBOARD_CUMUL_PRICE records parsed into NumPy arrays.
+
+    The payload is parsed in one pass into settlement times (datetime64 in
+    NEM time), prices, cumulative prices, region codes and actual flags.
+    PriceInterval records are only built for the rows that are selected.
+    """
+
+    __slots__ = ("settlement", "price", "cumulative", "region", "actual", "regions", "region_names")
+
+    def __init__(self, records: list[dict[str, Any]]):
+        block = np.array(
+            [(record["DT"], record["R"], record["P"], record["CP"], record["A"]) for record in records],
+            dtype=_CUMUL_PRICE_DTYPE,
+        )
+        self.settlement = block["DT"]
+        self.price = block["P"]
+        self.cumulative = block["CP"]
+        self.actual = block["A"] == 1
+        regions, self.region = np.unique(block["R"], return_inverse=True)
+        self.region_names = [str(region) for region in regions]
+        self.regions = {region: code for code, region in enumerate(self.region_names)}
+
+    @classmethod
+    def from_columns(cls, region_names: list[str], region, settlement, price, cumulative, actual) -> "CumulPriceBlock":
+        """Create from column arrays, with region as codes into region_names."""
+        block = cls.__new__(cls)
+        block.settlement = settlement
+        block.price = price
+        block.cumulative = cumulative
+        block.region = region
+        block.actual = actual
+        block.region_names = list(region_names)
+        block.regions = {name: code for code, name in enumerate(block.region_names)}
+        return block
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def record(self, index: int) -> PriceInterval:
+        """Return the record at index."""
+        return price_interval(
+            self.region_names[self.region[index]],
+            bool(self.actual[index]),
+            self.settlement[index],
+            self.price[index],
+            self.cumulative[index],
+        )
+
+    def region_view(self, region: str, start: datetime, end: datetime) -> RegionView | None:
+        """Return the actuals with a period start in [start, end) and the forecasts of a region."""
+        if region not in self.regions:
+            return None
+        in_region = self.region == self.regions[region]
+        actual_index = np.flatnonzero(in_region & self.actual)
+        if len(actual_index) == 0:
+            return None
+        forecast_index = np.flatnonzero(in_region & ~self.actual)
+        actual_settlement = self.settlement[actual_index]
+        # Actual periods start 5 minutes before their settlement date.
+        window_start = to_datetime64(start + timedelta(minutes=5))
+        window_end = to_datetime64(end + timedelta(minutes=5))
+        window_index = actual_index[(actual_settlement >= window_start) & (actual_settlement < window_end)]
+        latest_index = actual_index[np.argmax(actual_settlement)]
+        forecast = [self.record(index) for index in forecast_index]
+        first_forecast = None
+        if len(forecast_index):
+            first_forecast = forecast[int(np.argmin(self.settlement[forecast_index]))]
+        return RegionView(
+            window=[self.record(index) for index in window_index],
+            latest_actual=self.record(latest_index),
+            first_forecast=first_forecast,
+            forecast=forecast,
+        )
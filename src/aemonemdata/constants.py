@@ -1,3 +1,5 @@
+from datetime import timedelta, timezone
+
 from .str_enum import StrEnum
 
 
@@ -22,7 +24,50 @@ REGIONS = {
     "tas": "TAS1",
 }
     
+# Interconnectors whose names do not give their regions, as (from, to) for a
+# positive flow.
+INTERCONNECTOR_REGIONS = {
+    "N-Q-MNSP1": ("NSW1", "QLD1"),
+    "T-V-MNSP1": ("TAS1", "VIC1"),
+    "V-SA": ("VIC1", "SA1"),
+    "V-S-MNSP1": ("VIC1", "SA1"),
+}
+
 AUTH_ERROR_CODES = [
     "unauthorized_client",
     "Login session expired.",
-]
\ No newline at end of file
+]
+
+NEM_TIMEZONE = timezone(timedelta(hours=10))
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 15
+DEFAULT_CONNECTION_LIMIT = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_DNS_CACHE_TTL = 300
+
+DISPATCH_INTERVAL = timedelta(minutes=5)
+DISPATCH_PUBLISH_OFFSET = timedelta(seconds=30)
+CACHE_REVALIDATE_INTERVAL = timedelta(seconds=10)
+DEFAULT_RETENTION = timedelta(hours=24)
+CUMULATIVE_PRICE_WINDOW = 2016
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = timedelta(seconds=30)
+DEFAULT_STALE_TIMEOUT = timedelta(seconds=3)
+FETCH_LEASE = timedelta(seconds=30)
+LEASE_POLL_INTERVAL = 0.25
+SHARED_CACHE_RETENTION = timedelta(hours=24)
+SHARED_CACHE_TIMEOUT = 1
+SUBSCRIBE_RETRY_MIN = 2
+SUBSCRIBE_RETRY_MAX = 30
+
+CACHE_TTL = {
+    EndPoint.API_5MIN_URL: DISPATCH_INTERVAL,
+    EndPoint.API_ELEC_NEM_SUMMARY_URL: DISPATCH_INTERVAL,
+    EndPoint.API_CUMULATIVE_PRICE_URL: DISPATCH_INTERVAL,
+    EndPoint.API_MARKET_LIMITS_URL: timedelta(hours=24),
+}
@@ -0,0 +1,31 @@
+"""Dependency-free core of aemonemdata.
+
+Constants, time window helpers, record parsers, the interval store and the
+market index only need the standard library, so importing them does not
+load aiohttp or NumPy.
+"""
+from .constants import (
+    EndPoint,
+    BaseUrl,
+    REGIONS,
+    AUTH_ERROR_CODES
+)
+from .interval_store import (
+    IntervalStore,
+)
+from .market_index import (
+    MarketChange,
+    MarketIndex,
+)
+from .records import (
+    InterconnectorFlow,
+    PriceInterval,
+    RegionSummary,
+    parse_5min_record,
+)
+from .utils import (
+    current_30min_window,
+    current_5min_window,
+    next_publish_time,
+)
+__all__ = ["EndPoint","BaseUrl","REGIONS","AUTH_ERROR_CODES","IntervalStore","MarketChange","MarketIndex","InterconnectorFlow","PriceInterval","RegionSummary","parse_5min_record","current_30min_window","current_5min_window","next_publish_time"]
@@ -0,0 +1,108 @@
+"""Shared poller serving many region subscriptions from one fetch."""
+import asyncio
+import inspect
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from aiohttp import ClientSession
+from aiohttp import ClientError as AiohttpClientError
+
+from .aemonem import AemoNemData
+from .cache import BaseResponseCache
+from .instrumentation import Instrument
+from .transport import Transport
+from .constants import REGIONS, SUBSCRIBE_RETRY_MIN, SUBSCRIBE_RETRY_MAX
+from .exceptions import ClientError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AemoNemHub:
+    """Fetch the dashboard data once per dispatch interval for all subscribers.
+
+    Subscribers register a list of states (the same keys as ``REGIONS``) and a
+    callback. Each refresh fetches and parses the union of subscribed regions
+    once and calls every callback with a dict of region id to its
+    ``current_30min_forecast`` data. Callbacks may be plain functions or
+    coroutine functions.
+    """
+
+    def __init__(
+            self,
+            client_session: ClientSession = None,
+            cache: BaseResponseCache = None,
+            transport: Transport = None,
+            instrumentation: Instrument = None,
+        ):
+        self._client = AemoNemData(client_session, cache, transport=transport, instrumentation=instrumentation)
+        self._subscribers: dict[int, tuple[frozenset[str], Callable[[dict[str, Any]], Any]]] = {}
+        self._next_id = 0
+        self._results = {}
+
+    @property
+    def results(self) -> dict[str, Any]:
+        """Return the results of the last refresh."""
+        return self._results
+
+    def subscribe(self, state: list, callback: Callable[[dict[str, Any]], Any]) -> Callable[[], None]:
+        """Register a callback for states and return a function that removes it."""
+        regions = frozenset(REGIONS[region.lower()] for region in state)
+        subscriber_id = self._next_id
+        self._next_id += 1
+        self._subscribers[subscriber_id] = (regions, callback)
+
+        def unsubscribe() -> None:
+            self._subscribers.pop(subscriber_id, None)
+
+        return unsubscribe
+
+    async def refresh(self) -> dict[str, Any]:
+        """Fetch once for all subscribed regions and push results to subscribers."""
+        regions = set()
+        for subscribed_regions, _ in self._subscribers.values():
+            regions.update(subscribed_regions)
+        if not regions:
+            return self._results
+        self._results = await self._client.get_region_data(sorted(regions))
+        forecasts = self._results.get("current_30min_forecast", {})
+        for subscribed_regions, callback in list(self._subscribers.values()):
+            data = {region: forecasts[region] for region in subscribed_regions if region in forecasts}
+            try:
+                result = callback(data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in AEMO NEM subscriber callback")
+        return self._results
+
+    async def run(self) -> None:
+        """Refresh each time a dispatch interval is published, until cancelled.
+
+        After each refresh the hub waits for ELEC_NEM_SUMMARY to show a newer
+        settlement date, as ``AemoNemData.subscribe`` does. A failed refresh
+        is retried with exponential backoff.
+        """
+        delay = SUBSCRIBE_RETRY_MIN
+        while True:
+            try:
+                await self.refresh()
+            except (ClientError, AiohttpClientError, asyncio.TimeoutError) as error:
+                _LOGGER.warning("AEMO NEM refresh failed: %s", error)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, SUBSCRIBE_RETRY_MAX)
+                continue
+            delay = SUBSCRIBE_RETRY_MIN
+            await self._client.wait_for_dispatch()
+
+    async def __aenter__(self) -> "AemoNemHub":
+        """Enter the hub context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the hub."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the session if the hub created it."""
+        await self._client.close()
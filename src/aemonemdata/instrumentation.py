@@ -0,0 +1,138 @@
+"""Optional timing and counter hooks for AemoNemData.
+
+An instrument is any callable taking ``(metric, value, tags)``. AemoNemData
+calls it with these metrics, tagged with the report name as ``endpoint``
+where one applies:
+
+- ``request.dns_s``, ``request.connect_s``, ``request.headers_s`` and
+  ``request.reused_connection`` from the aiohttp trace config
+- ``fetch_s`` for a transport round trip, including the body
+- ``response_bytes`` for each body received
+- ``cache_hit``, ``cache_miss``, ``cache_revalidated`` and ``cache_shared``
+  (a response fetched by another worker), each with value 1
+- ``retry``, ``circuit_open`` and ``stale_served``, each with value 1
+- ``decode_s``, ``parse_s`` and ``records`` for each payload parsed
+- ``regions_changed`` for the regions a cumulative price payload changed in
+  the interval store
+- ``aggregate_s`` for building the per-region results
+
+``Stats`` is an instrument that keeps totals which can be exported.
+"""
+from collections import defaultdict
+from collections.abc import Callable
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import TraceConfig
+
+Instrument = Callable[[str, float, dict[str, str]], None]
+
+
+def _endpoint_name(url: Any) -> str:
+    """Return the report name at the end of a url."""
+    return str(url).rstrip('/').rsplit('/', 1)[-1]
+
+
+def create_trace_config(instrument: Instrument) -> TraceConfig:
+    """Return an aiohttp TraceConfig that reports connection timings to instrument.
+
+    AemoNemData adds it to sessions it creates. Add it to the trace_configs
+    of an injected ClientSession to get the same timings.
+    """
+    trace_config = TraceConfig()
+
+    async def on_request_start(session, context: SimpleNamespace, params) -> None:
+        context.endpoint = _endpoint_name(params.url.path)
+        context.request_start = perf_counter()
+
+    async def on_dns_resolvehost_start(session, context: SimpleNamespace, params) -> None:
+        context.dns_start = perf_counter()
+
+    async def on_dns_resolvehost_end(session, context: SimpleNamespace, params) -> None:
+        instrument("request.dns_s", perf_counter() - context.dns_start, {"endpoint": context.endpoint})
+
+    async def on_connection_create_start(session, context: SimpleNamespace, params) -> None:
+        context.connect_start = perf_counter()
+
+    async def on_connection_create_end(session, context: SimpleNamespace, params) -> None:
+        instrument("request.connect_s", perf_counter() - context.connect_start, {"endpoint": context.endpoint})
+
+    async def on_connection_reuseconn(session, context: SimpleNamespace, params) -> None:
+        instrument("request.reused_connection", 1, {"endpoint": context.endpoint})
+
+    async def on_request_end(session, context: SimpleNamespace, params) -> None:
+        instrument("request.headers_s", perf_counter() - context.request_start, {"endpoint": context.endpoint})
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+class Stats:
+    """Instrument that keeps the count, total and maximum of each metric.
+
+    Metrics are kept per tag set. ``summary()`` returns them as a dict and
+    ``prometheus()`` in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._count: dict[tuple[str, tuple], int] = defaultdict(int)
+        self._total: dict[tuple[str, tuple], float] = defaultdict(float)
+        self._max: dict[tuple[str, tuple], float] = {}
+
+    def __call__(self, metric: str, value: float, tags: dict[str, str]) -> None:
+        key = (metric, tuple(sorted(tags.items())))
+        self._count[key] += 1
+        self._total[key] += value
+        if key not in self._max or value > self._max[key]:
+            self._max[key] = value
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Return one dict per metric and tag set."""
+        return [
+            {
+                "metric": metric,
+                "tags": dict(tags),
+                "count": count,
+                "total": self._total[(metric, tags)],
+                "mean": self._total[(metric, tags)] / count,
+                "max": self._max[(metric, tags)],
+            }
+            for (metric, tags), count in self._count.items()
+        ]
+
+    def total(self, metric: str, **tags: str) -> float:
+        """Return the total of a metric over all tag sets matching tags."""
+        return sum(
+            value for (name, key_tags), value in self._total.items()
+            if name == metric and tags.items() <= dict(key_tags).items()
+        )
+
+    def cache_hit_ratio(self, **tags: str) -> float | None:
+        """Return the share of cached requests that were hits, if any were made."""
+        hits = self.total("cache_hit", **tags) + self.total("cache_revalidated", **tags)
+        requests = hits + self.total("cache_miss", **tags)
+        return hits / requests if requests else None
+
+    def prometheus(self, prefix: str = "aemonemdata") -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        for (metric, tags), count in sorted(self._count.items()):
+            name = f'{prefix}_{metric.replace(".", "_")}'
+            labels = ",".join(f'{key}="{value}"' for key, value in tags)
+            labels = f'{{{labels}}}' if labels else ''
+            lines.append(f'{name}_count{labels} {count}')
+            lines.append(f'{name}_sum{labels} {self._total[(metric, tags)]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all metrics."""
+        self._count.clear()
+        self._total.clear()
+        self._max.clear()
@@ -0,0 +1,189 @@
+"""Rolling store of cumulative price intervals."""
+from bisect import insort
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+from .constants import NEM_TIMEZONE, DEFAULT_RETENTION
+from .records import PriceInterval, RegionView
+
+TRADING_INTERVAL = timedelta(minutes=30)
+
+
+def trading_interval_start(period_start_date: datetime) -> datetime:
+    """Return the start of the 30 minute trading interval containing a period start."""
+    return period_start_date.replace(
+        minute=period_start_date.minute - period_start_date.minute % 30,
+        second=0,
+        microsecond=0,
+    )
+
+
+class _RegionIntervals:
+    """Actual and forecast intervals of one region."""
+
+    __slots__ = ("actual", "order", "buckets", "forecast")
+
+    def __init__(self):
+        self.actual: dict[datetime, PriceInterval] = {}
+        self.order: deque[datetime] = deque()
+        self.buckets: dict[datetime, dict[datetime, PriceInterval]] = {}
+        self.forecast: list[PriceInterval] = []
+
+
+class IntervalStore:
+    """De-duplicated rolling store of PriceInterval records.
+
+    Actual intervals are keyed by (region, settlement_date) and kept for
+    ``retention`` behind the newest settlement date seen. Merging a payload
+    only builds records for new or revised intervals, and the forecasts of a
+    region are replaced by the ones in the newest payload. Actuals are also
+    grouped by 30 minute trading interval, so the current window is a lookup
+    rather than a scan of the history.
+    """
+
+    def __init__(self, retention: timedelta = DEFAULT_RETENTION):
+        self._retention = retention
+        self._regions: dict[str, _RegionIntervals] = {}
+        self._latest: datetime | None = None
+
+    def __len__(self) -> int:
+        return sum(len(region.actual) for region in self._regions.values())
+
+    @property
+    def regions(self) -> list[str]:
+        """Return the regions in the store."""
+        return list(self._regions)
+
+    @property
+    def retention(self) -> timedelta:
+        """Return how far behind the newest settlement date actuals are kept."""
+        return self._retention
+
+    @property
+    def latest(self) -> datetime | None:
+        """Return the newest actual settlement date in the store."""
+        return self._latest
+
+    def merge_cumul_price(self, records: list[dict[str, Any]]) -> set[str]:
+        """Merge raw NEM_DASHBOARD_CUMUL_PRICE records and return the regions that changed."""
+        changed = set()
+        forecasts: dict[str, list[PriceInterval]] = {}
+        latest = self._latest
+        actual_dates = [record["DT"] for record in records if record["A"] == 1]
+        if actual_dates:
+            payload_latest = datetime.fromisoformat(max(actual_dates)).replace(tzinfo=NEM_TIMEZONE)
+            if latest is None or payload_latest > latest:
+                latest = payload_latest
+        # AEMO dates are ISO strings in NEM time, so rows older than the
+        # retention window are skipped before they are parsed.
+        cutoff = None
+        if latest is not None:
+            cutoff = (latest - self._retention).astimezone(NEM_TIMEZONE).replace(tzinfo=None).isoformat()
+        for record in records:
+            if record["A"] == 0:
+                forecasts.setdefault(record["R"], []).append(PriceInterval.from_cumul_price(record))
+                continue
+            if cutoff is not None and record["DT"] < cutoff:
+                continue
+            region = self._regions.get(record["R"])
+            if region is not None:
+                existing = region.actual.get(datetime.fromisoformat(record["DT"]).replace(tzinfo=NEM_TIMEZONE))
+                if (
+                    existing is not None
+                    and existing.price_mw == record["P"]
+                    and existing.cumulative_price == record["CP"]
+                ):
+                    continue
+            self.add(PriceInterval.from_cumul_price(record))
+            changed.add(record["R"])
+        for region_id, forecast in forecasts.items():
+            region = self._region(region_id)
+            if region.forecast != forecast:
+                region.forecast = forecast
+                changed.add(region_id)
+        self.evict()
+        return changed
+
+    def add(self, interval: PriceInterval) -> None:
+        """Add or replace an actual interval."""
+        region = self._region(interval.region_id)
+        settlement_date = interval.settlement_date
+        if settlement_date not in region.actual:
+            if not region.order or settlement_date > region.order[-1]:
+                region.order.append(settlement_date)
+            else:
+                insort(region.order, settlement_date)
+        region.actual[settlement_date] = interval
+        region.buckets.setdefault(
+            trading_interval_start(interval.period_start_date), {}
+        )[settlement_date] = interval
+        if self._latest is None or settlement_date > self._latest:
+            self._latest = settlement_date
+
+    def set_forecast(self, region_id: str, forecast: list[PriceInterval]) -> None:
+        """Replace the forecast intervals of a region."""
+        self._region(region_id).forecast = list(forecast)
+
+    def evict(self) -> None:
+        """Drop actual intervals older than the retention window."""
+        if self._latest is None:
+            return
+        cutoff = self._latest - self._retention
+        for region in self._regions.values():
+            while region.order and region.order[0] < cutoff:
+                interval = region.actual.pop(region.order.popleft())
+                bucket_start = trading_interval_start(interval.period_start_date)
+                bucket = region.buckets[bucket_start]
+                del bucket[interval.settlement_date]
+                if not bucket:
+                    del region.buckets[bucket_start]
+
+    def actual(self, region_id: str, start: datetime = None, end: datetime = None) -> list[PriceInterval]:
+        """Return the actual intervals of a region with a period start in [start, end)."""
+        region = self._regions.get(region_id)
+        if region is None:
+            return []
+        return [
+            region.actual[settlement_date]
+            for settlement_date in region.order
+            if (start is None or region.actual[settlement_date].period_start_date >= start)
+            and (end is None or region.actual[settlement_date].period_start_date < end)
+        ]
+
+    def forecast(self, region_id: str) -> list[PriceInterval]:
+        """Return the current forecast intervals of a region."""
+        region = self._regions.get(region_id)
+        return list(region.forecast) if region is not None else []
+
+    def region_view(self, region_id: str, start: datetime, end: datetime) -> RegionView | None:
+        """Return the actuals with a period start in [start, end) and the forecasts of a region."""
+        region = self._regions.get(region_id)
+        if region is None or not region.order:
+            return None
+        window = []
+        bucket_start = trading_interval_start(start)
+        while bucket_start < end:
+            for settlement_date in sorted(region.buckets.get(bucket_start, ())):
+                interval = region.buckets[bucket_start][settlement_date]
+                if start <= interval.period_start_date < end:
+                    window.append(interval)
+            bucket_start += TRADING_INTERVAL
+        return RegionView(
+            window=window,
+            latest_actual=region.actual[region.order[-1]],
+            first_forecast=min(region.forecast, key=lambda x:x.settlement_date) if region.forecast else None,
+            forecast=list(region.forecast),
+        )
+
+    def clear(self) -> None:
+        """Drop all intervals."""
+        self._regions.clear()
+        self._latest = None
+
+    def _region(self, region_id: str) -> _RegionIntervals:
+        """Return the intervals of a region, creating them if needed."""
+        region = self._regions.get(region_id)
+        if region is None:
+            region = self._regions[region_id] = _RegionIntervals()
+        return region
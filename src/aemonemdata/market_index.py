@@ -0,0 +1,110 @@
+"""Index of ELEC_NEM_SUMMARY interconnector flows and market notices."""
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .records import InterconnectorFlow, RegionSummary, parse_interconnector_flows
+
+
+@dataclass(frozen=True, slots=True)
+class MarketChange:
+    """A change seen between two ELEC_NEM_SUMMARY payloads.
+
+    ``kind`` is one of ``export_limit``, ``import_limit`` and
+    ``within_limits`` for an interconnector named ``subject``, or
+    ``new_notice`` and ``removed_notice`` for the market notice with ID
+    ``subject``.
+    """
+
+    kind: str
+    subject: str
+    message: str
+    value: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the change as a dict."""
+        return asdict(self)
+
+
+def notice_id(notice: dict[str, Any]) -> str:
+    """Return the ID of a market notice, or a digest of it when it has none."""
+    for key in ("ID", "NOTICEID"):
+        if notice.get(key) is not None:
+            return str(notice[key])
+    return hashlib.sha1(json.dumps(notice, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class MarketIndex:
+    """Current region summaries, interconnectors and market notices.
+
+    ``update`` parses only the region summaries whose record changed since
+    the previous payload, reusing the parsed flows when the raw
+    INTERCONNECTORFLOWS string is unchanged. It returns the interconnectors
+    that reached or left a limit and the notices that were added or removed.
+    """
+
+    def __init__(self):
+        self.summaries: dict[str, RegionSummary] = {}
+        self.interconnectors: dict[str, InterconnectorFlow] = {}
+        self.notices: dict[str, dict[str, Any]] = {}
+        self.prices: dict[str, dict[str, Any]] = {}
+        self._records: dict[str, dict[str, Any]] = {}
+        self._flows: dict[str, tuple[Any, tuple[InterconnectorFlow, ...]]] = {}
+
+    def update(self, response: dict[str, Any]) -> list[MarketChange]:
+        """Merge an ELEC_NEM_SUMMARY payload and return what changed."""
+        changes = []
+        interconnectors = {}
+        for record in response["ELEC_NEM_SUMMARY"]:
+            region_id = record["REGIONID"]
+            if self._records.get(region_id) != record:
+                raw_flows = record["INTERCONNECTORFLOWS"]
+                cached = self._flows.get(region_id)
+                if cached is None or cached[0] != raw_flows:
+                    cached = self._flows[region_id] = (raw_flows, parse_interconnector_flows(raw_flows))
+                self.summaries[region_id] = RegionSummary.from_summary(record, cached[1])
+                self._records[region_id] = record
+            for flow in self.summaries[region_id].interconnector_flows:
+                interconnectors[flow.name] = flow
+        for name, flow in interconnectors.items():
+            previous = self.interconnectors.get(name)
+            state = flow.limit_state
+            if state != (previous.limit_state if previous is not None else None):
+                changes.append(self._limit_change(flow, state))
+        self.interconnectors.update(interconnectors)
+
+        notices = {notice_id(notice): notice for notice in response.get("ELEC_NEM_SUMMARY_MARKET_NOTICE", [])}
+        for key in sorted(notices.keys() - self.notices.keys()):
+            changes.append(MarketChange("new_notice", key, f'New market notice {key}'))
+        for key in sorted(self.notices.keys() - notices.keys()):
+            changes.append(MarketChange("removed_notice", key, f'Market notice {key} removed'))
+        self.notices = notices
+
+        for price in response.get("ELEC_NEM_SUMMARY_PRICES", []):
+            self.prices[price["REGIONID"]] = price
+        return changes
+
+    @staticmethod
+    def _limit_change(flow: InterconnectorFlow, state: str | None) -> MarketChange:
+        """Return the change for a flow that reached or left a limit."""
+        if state == "export":
+            return MarketChange("export_limit", flow.name, f'{flow.name} reached its export limit of {flow.export_limit}', flow.value)
+        if state == "import":
+            return MarketChange("import_limit", flow.name, f'{flow.name} reached its import limit of {flow.import_limit}', flow.value)
+        return MarketChange("within_limits", flow.name, f'{flow.name} is back within its limits', flow.value)
+
+    def for_region(self, region_id: str) -> list[InterconnectorFlow]:
+        """Return the interconnectors connected to a region."""
+        return [
+            flow for flow in self.interconnectors.values()
+            if region_id in (flow.from_region, flow.to_region)
+        ]
+
+    def between(self, from_region: str, to_region: str) -> list[InterconnectorFlow]:
+        """Return the interconnectors between two regions, in either direction."""
+        regions = {from_region, to_region}
+        return [
+            flow for flow in self.interconnectors.values()
+            if {flow.from_region, flow.to_region} == regions
+        ]
@@ -0,0 +1,194 @@
+"""Compact record types for parsed AEMO data."""
+import json
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from .constants import INTERCONNECTOR_REGIONS
+
+
+@dataclass(frozen=True, slots=True)
+class PriceInterval:
+    """One NEM_DASHBOARD_CUMUL_PRICE interval for a region."""
+
+    period_type: str | None
+    settlement_date: datetime | None
+    period_start_date: datetime | None
+    region_id: str | None
+    price_mw: float | None
+    price_kw: float | None
+    cumulative_price: float | None
+
+    @classmethod
+    def from_cumul_price(cls, record: dict[str, Any]) -> "PriceInterval":
+        """Create from a raw NEM_DASHBOARD_CUMUL_PRICE record."""
+        settlement_date = datetime.fromisoformat(record["DT"]+'+10:00')
+        if record["A"] == 1:
+            period_type = "actual"
+            period_start_date = settlement_date - timedelta(minutes=5)
+        elif record["A"] == 0:
+            period_type = "forecast"
+            period_start_date = settlement_date - timedelta(minutes=30)
+        else:
+            raise ValueError(f'Unknown actual flag {record["A"]!r}')
+        return cls(
+            period_type=period_type,
+            settlement_date=settlement_date,
+            period_start_date=period_start_date,
+            region_id=record["R"],
+            price_mw=record["P"],
+            price_kw=round(record["P"]/1000,4),
+            cumulative_price=record["CP"],
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def empty(region_id: str) -> "PriceInterval":
+        """Return the shared placeholder for a missing period of a region."""
+        return PriceInterval(None, None, None, region_id, None, None, None)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as a dict keyed by field name."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+def parse_5min_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Add parsed dates and the per kW price to a raw 5MIN record, in place."""
+    record['SETTLEMENTDATE']=datetime.fromisoformat(record['SETTLEMENTDATE']+'+10:00')
+    record['SPOTPRICEPERKW']= round(record['RRP']/1000,4)
+    if record['PERIODTYPE'] == 'ACTUAL':
+        record['PERIODSTARTDATE'] = record['SETTLEMENTDATE'] - timedelta(minutes=5)
+    elif record['PERIODTYPE'] == 'FORECAST':
+        record['PERIODSTARTDATE'] = record['SETTLEMENTDATE'] - timedelta(minutes=30)
+    return record
+
+
+@dataclass(frozen=True, slots=True)
+class InterconnectorFlow:
+    """One entry of the ELEC_NEM_SUMMARY INTERCONNECTORFLOWS list.
+
+    A positive value flows from ``from_region`` to ``to_region``. The regions
+    are None for interconnectors missing from INTERCONNECTOR_REGIONS whose
+    name is not of the form ``<region>-<region>``.
+    """
+
+    name: str
+    value: float
+    export_limit: float
+    import_limit: float
+    from_region: str | None = None
+    to_region: str | None = None
+
+    @classmethod
+    def from_summary(cls, flow: dict[str, Any]) -> "InterconnectorFlow":
+        """Create from a decoded INTERCONNECTORFLOWS entry."""
+        from_region, to_region = interconnector_regions(flow["name"])
+        return cls(
+            name=flow["name"],
+            value=flow["value"],
+            export_limit=flow["exportlimit"],
+            import_limit=flow["importlimit"],
+            from_region=from_region,
+            to_region=to_region,
+        )
+
+    @property
+    def limit_state(self) -> str | None:
+        """Return 'export' or 'import' when the flow is at or beyond that limit."""
+        if self.export_limit is not None and self.value >= self.export_limit:
+            return "export"
+        if self.import_limit is not None and self.value <= self.import_limit:
+            return "import"
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the flow in the shape of the AEMO payload."""
+        return {
+            "name": self.name,
+            "value": self.value,
+            "exportlimit": self.export_limit,
+            "importlimit": self.import_limit,
+        }
+
+
+def interconnector_regions(name: str) -> tuple[str | None, str | None]:
+    """Return the regions an interconnector flows from and to."""
+    if name in INTERCONNECTOR_REGIONS:
+        return INTERCONNECTOR_REGIONS[name]
+    from_region, _, to_region = name.partition('-')
+    if from_region.endswith('1') and to_region.endswith('1'):
+        return from_region, to_region
+    return None, None
+
+
+def parse_interconnector_flows(flows: str | list[dict[str, Any]]) -> tuple[InterconnectorFlow, ...]:
+    """Parse an INTERCONNECTORFLOWS value, which AEMO sends as a JSON string."""
+    if isinstance(flows, str):
+        flows = json.loads(flows)
+    return tuple(InterconnectorFlow.from_summary(flow) for flow in flows)
+
+
+@dataclass(frozen=True, slots=True)
+class RegionSummary:
+    """One ELEC_NEM_SUMMARY record for a region."""
+
+    region_id: str
+    settlement_date_str: str
+    settlement_date: datetime
+    total_demand: float
+    scheduled_generation: float
+    semi_scheduled_generation: float
+    net_interchange: float
+    interconnector_flows: tuple[InterconnectorFlow, ...]
+    apc_flag: bool
+    market_suspended_flag: bool
+
+    @classmethod
+    def from_summary(
+            cls,
+            record: dict[str, Any],
+            interconnector_flows: tuple[InterconnectorFlow, ...] | None = None,
+        ) -> "RegionSummary":
+        """Create from a raw ELEC_NEM_SUMMARY record.
+
+        Pass ``interconnector_flows`` to reuse flows already parsed from the
+        same INTERCONNECTORFLOWS value.
+        """
+        if interconnector_flows is None:
+            interconnector_flows = parse_interconnector_flows(record["INTERCONNECTORFLOWS"])
+        return cls(
+            region_id=record["REGIONID"],
+            settlement_date_str=record["SETTLEMENTDATE"],
+            settlement_date=datetime.fromisoformat(record["SETTLEMENTDATE"]+'+10:00'),
+            total_demand=record["TOTALDEMAND"],
+            scheduled_generation=record["SCHEDULEDGENERATION"],
+            semi_scheduled_generation=record["SEMISCHEDULEDGENERATION"],
+            net_interchange=record["NETINTERCHANGE"],
+            interconnector_flows=interconnector_flows,
+            apc_flag=record["APCFLAG"] == 1,
+            market_suspended_flag=record["MARKETSUSPENDEDFLAG"] == 1,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record in the shape of the AEMO payload."""
+        return {
+            "REGIONID": self.region_id,
+            "SETTLEMENTDATE": self.settlement_date_str,
+            "TOTALDEMAND": self.total_demand,
+            "SCHEDULEDGENERATION": self.scheduled_generation,
+            "SEMISCHEDULEDGENERATION": self.semi_scheduled_generation,
+            "NETINTERCHANGE": self.net_interchange,
+            "INTERCONNECTORFLOWS": [flow.as_dict() for flow in self.interconnector_flows],
+            "APCFLAG": int(self.apc_flag),
+            "MARKETSUSPENDEDFLAG": int(self.market_suspended_flag),
+        }
+
+
+class RegionView(NamedTuple):
+    """Records of one region needed for the current 30 minute results."""
+
+    window: list[PriceInterval]
+    latest_actual: PriceInterval
+    first_forecast: PriceInterval | None
+    forecast: list[PriceInterval]
@@ -0,0 +1,193 @@
+"""Retry, circuit breaking and coalescing of API requests."""
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from aiohttp import ClientError as AiohttpClientError
+
+from .constants import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_RESET_TIMEOUT,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    RETRY_STATUSES,
+)
+from .exceptions import ClientError
+from .instrumentation import Instrument
+from .transport import Transport, TransportResponse
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    A request is tried up to ``attempts`` times. Before retry n it waits a
+    random time of up to ``base_delay * 2 ** (n - 1)`` seconds, capped at
+    ``max_delay``.
+    """
+
+    attempts: int = DEFAULT_RETRY_ATTEMPTS
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY
+
+    def delay(self, retry: int) -> float:
+        """Return the wait before a retry, counting from 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after repeated failures.
+
+    The circuit opens after ``failure_threshold`` failures in a row. While it
+    is open requests fail straight away. After ``reset_timeout`` one trial
+    request is let through, which closes the circuit on success and opens it
+    again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: timedelta = DEFAULT_RESET_TIMEOUT):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout.total_seconds()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests are currently refused."""
+        if self._opened_at is None:
+            return False
+        return self._trial or time.monotonic() - self._opened_at < self._reset_timeout
+
+    def allow(self) -> bool:
+        """Return whether a request may be made, starting a trial if one is due."""
+        if self.is_open:
+            return False
+        if self._opened_at is not None:
+            self._trial = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def abort(self) -> None:
+        """End a trial without an outcome, such as when it was cancelled."""
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit at the threshold."""
+        self._failures += 1
+        self._trial = False
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class RequestScheduler:
+    """Make transport requests with retry, a circuit breaker per endpoint and coalescing.
+
+    Requests that fail with a status in RETRY_STATUSES, an aiohttp client
+    error or a timeout are retried according to ``retry``. Other responses
+    are returned to the caller unchanged. Concurrent calls of ``coalesce``
+    with the same key share one in-flight task.
+    """
+
+    def __init__(
+            self,
+            retry: RetryPolicy = None,
+            failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+            reset_timeout: timedelta = DEFAULT_RESET_TIMEOUT,
+            instrumentation: Instrument = None,
+        ):
+        self._retry = retry if retry is not None else RetryPolicy()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._instrument = instrumentation
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """Return the circuit breaker of an endpoint."""
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(self._failure_threshold, self._reset_timeout)
+        return breaker
+
+    def in_flight(self, key: str) -> bool:
+        """Return whether a request for key is in flight."""
+        return key in self._in_flight
+
+    def coalesce(self, key: str, request: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the in-flight task for key, starting request if there is none."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(request())
+
+            def done(task: asyncio.Task) -> None:
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                # Callers may stop waiting, so always retrieve the result.
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(done)
+        return task
+
+    async def request(
+            self,
+            transport: Transport,
+            name: str,
+            method: str,
+            url: str,
+            headers: dict[str, Any],
+            **kwargs
+        ) -> TransportResponse:
+        """Make a request for the endpoint called name."""
+        breaker = self.breaker(name)
+        if not breaker.allow():
+            self._count("circuit_open", name)
+            raise ClientError(f'Circuit open for {name}')
+        try:
+            return await self._request_with_retry(breaker, transport, name, method, url, headers, **kwargs)
+        except BaseException:
+            breaker.abort()
+            raise
+
+    async def _request_with_retry(
+            self,
+            breaker: CircuitBreaker,
+            transport: Transport,
+            name: str,
+            method: str,
+            url: str,
+            headers: dict[str, Any],
+            **kwargs
+        ) -> TransportResponse:
+        """Make a request, retrying failures and recording the outcome on breaker."""
+        for attempt in range(1, self._retry.attempts + 1):
+            try:
+                response = await transport.request(method, url, headers, **kwargs)
+            except (AiohttpClientError, asyncio.TimeoutError):
+                if attempt == self._retry.attempts:
+                    breaker.record_failure()
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                if attempt == self._retry.attempts:
+                    breaker.record_failure()
+                    return response
+            self._count("retry", name)
+            await asyncio.sleep(self._retry.delay(attempt))
+
+    def _count(self, metric: str, name: str) -> None:
+        """Report an event to the instrument."""
+        if self._instrument is not None:
+            self._instrument(metric, 1, {"endpoint": name})
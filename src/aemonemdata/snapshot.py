@@ -0,0 +1,223 @@
+"""Memory-mapped on-disk store of cumulative price history.
+
+Intervals are kept in one NumPy ``.npy`` file per period type, region and
+NEM day at ``<directory>/<period type>/<region>/<YYYYMMDD>.npy``. Each file
+holds the rows of that day sorted by settlement date, with one row per
+settlement date. Actual rows are the 5 minute dispatch intervals and
+forecast rows the last 30 minute forecast seen for each period.
+
+Files are opened memory-mapped, so a range within one day is read as a view
+of the file without copying. Appending rewrites only the day files whose
+rows changed, through a temporary file and an atomic rename, so readers
+never see a partial file. Appends to one store are serialised, so
+concurrent writers do not lose each other's rows. NumPy is required.
+"""
+import os
+import tempfile
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .columnar import HAS_NUMPY, CumulPriceBlock, np, price_interval, to_datetime64
+from .constants import NEM_TIMEZONE
+from .interval_store import IntervalStore
+from .records import PriceInterval
+
+SNAPSHOT_DTYPE = [
+    ("settlement", "datetime64[s]"),
+    ("price", "f8"),
+    ("cumulative", "f8"),
+]
+PERIOD_TYPES = ("actual", "forecast")
+
+
+class SnapshotStore:
+    """Partitioned columnar store of PriceInterval history."""
+
+    def __init__(self, directory: str | Path):
+        if not HAS_NUMPY:
+            raise ImportError("the snapshot store requires numpy")
+        self._directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def append_block(self, block: CumulPriceBlock) -> int:
+        """Merge a parsed NEM_DASHBOARD_CUMUL_PRICE payload and return the rows written."""
+        written = 0
+        for region_id, code in block.regions.items():
+            in_region = block.region == code
+            for period_type, selected in (("actual", in_region & block.actual), ("forecast", in_region & ~block.actual)):
+                rows = np.empty(int(selected.sum()), dtype=SNAPSHOT_DTYPE)
+                rows["settlement"] = block.settlement[selected]
+                rows["price"] = block.price[selected]
+                rows["cumulative"] = block.cumulative[selected]
+                written += self._append_rows(period_type, region_id, rows)
+        return written
+
+    def append(self, intervals: list[PriceInterval]) -> int:
+        """Merge PriceInterval records and return the rows written."""
+        grouped: dict[tuple[str, str], list[tuple]] = {}
+        for interval in intervals:
+            grouped.setdefault((interval.period_type, interval.region_id), []).append((
+                to_datetime64(interval.settlement_date),
+                interval.price_mw,
+                interval.cumulative_price,
+            ))
+        return sum(
+            self._append_rows(period_type, region_id, np.array(rows, dtype=SNAPSHOT_DTYPE))
+            for (period_type, region_id), rows in grouped.items()
+        )
+
+    def read(self, region_id: str, start: datetime, end: datetime, period_type: str = "actual"):
+        """Return the rows of a region with a settlement date in [start, end).
+
+        The result is a structured array with ``settlement`` (NEM time),
+        ``price`` and ``cumulative`` fields. A range within one day is a view
+        of the memory-mapped file, a longer range is concatenated.
+        """
+        start64 = to_datetime64(start)
+        end64 = to_datetime64(end)
+        parts = []
+        for day in self._days(start64, end64):
+            rows = self._load(period_type, region_id, day)
+            if rows is None:
+                continue
+            settlement = rows["settlement"]
+            parts.append(rows[np.searchsorted(settlement, start64):np.searchsorted(settlement, end64)])
+        if not parts:
+            return np.empty(0, dtype=SNAPSHOT_DTYPE)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def intervals(self, region_id: str, start: datetime, end: datetime, period_type: str = "actual") -> list[PriceInterval]:
+        """Return the PriceInterval records of a region with a settlement date in [start, end)."""
+        actual = period_type == "actual"
+        return [
+            price_interval(region_id, actual, row["settlement"], row["price"], row["cumulative"])
+            for row in self.read(region_id, start, end, period_type)
+        ]
+
+    def block(self, start: datetime, end: datetime, regions: list[str] = None) -> CumulPriceBlock:
+        """Return the actual and forecast rows with a settlement date in [start, end) as a CumulPriceBlock."""
+        region_names = regions or sorted(set(self.regions()) | set(self.regions("forecast")))
+        parts = []
+        for code, region_id in enumerate(region_names):
+            for period_type in PERIOD_TYPES:
+                rows = self.read(region_id, start, end, period_type)
+                parts.append((code, period_type == "actual", rows))
+        return CumulPriceBlock.from_columns(
+            region_names,
+            np.concatenate([np.full(len(rows), code, dtype=np.int64) for code, _, rows in parts]),
+            np.concatenate([rows["settlement"] for _, _, rows in parts]),
+            np.concatenate([rows["price"] for _, _, rows in parts]),
+            np.concatenate([rows["cumulative"] for _, _, rows in parts]),
+            np.concatenate([np.full(len(rows), actual) for _, actual, rows in parts]),
+        )
+
+    def regions(self, period_type: str = "actual") -> list[str]:
+        """Return the regions with stored rows."""
+        directory = self._directory / period_type
+        if not directory.exists():
+            return []
+        return sorted(path.name for path in directory.iterdir() if path.is_dir())
+
+    def latest(self, region_id: str, period_type: str = "actual") -> datetime | None:
+        """Return the newest stored settlement date of a region."""
+        for path in reversed(self._files(period_type, region_id)):
+            rows = np.load(path, mmap_mode='r')
+            if len(rows):
+                return rows["settlement"][-1].astype(datetime).replace(tzinfo=NEM_TIMEZONE)
+        return None
+
+    def warm_start(self, store: IntervalStore) -> int:
+        """Load the retention window of actuals and the current forecasts into an IntervalStore.
+
+        Returns the number of actual intervals added.
+        """
+        latest = max(
+            (date for date in (self.latest(region_id) for region_id in self.regions()) if date is not None),
+            default=None,
+        )
+        if latest is None:
+            return 0
+        added = 0
+        end = latest + timedelta(seconds=1)
+        for region_id in self.regions():
+            for interval in self.intervals(region_id, latest - store.retention, end):
+                store.add(interval)
+                added += 1
+            forecast_latest = self.latest(region_id, "forecast")
+            if forecast_latest is not None and forecast_latest >= end:
+                store.set_forecast(
+                    region_id,
+                    self.intervals(region_id, end, forecast_latest + timedelta(seconds=1), "forecast"),
+                )
+        store.evict()
+        return added
+
+    def _append_rows(self, period_type: str, region_id: str, rows) -> int:
+        """Merge rows into their day files and return the rows written."""
+        if len(rows) == 0:
+            return 0
+        with self._lock:
+            return self._merge_rows(period_type, region_id, rows)
+
+    def _merge_rows(self, period_type: str, region_id: str, rows) -> int:
+        """Merge rows into their day files while holding the lock."""
+        days = rows["settlement"].astype("datetime64[D]")
+        written = 0
+        for day in np.unique(days):
+            new = rows[days == day]
+            existing = self._load(period_type, region_id, day)
+            if existing is not None:
+                # Later rows win, so new rows go last before de-duplicating.
+                new = np.concatenate([np.asarray(existing), new])
+            settlement = new["settlement"][::-1]
+            _, last = np.unique(settlement, return_index=True)
+            merged = new[len(new) - 1 - last]
+            if existing is not None and len(existing) == len(merged) and np.array_equal(existing, merged):
+                continue
+            self._save(period_type, region_id, day, merged)
+            written += len(merged)
+        return written
+
+    def _path(self, period_type: str, region_id: str, day) -> Path:
+        """Return the file of a day."""
+        if period_type not in PERIOD_TYPES:
+            raise ValueError(f'Unknown period type {period_type!r}')
+        return self._directory / period_type / region_id / f'{str(day).replace("-", "")}.npy'
+
+    def _files(self, period_type: str, region_id: str) -> list[Path]:
+        """Return the day files of a region, oldest first."""
+        directory = self._directory / period_type / region_id
+        if not directory.exists():
+            return []
+        return sorted(directory.glob('*.npy'))
+
+    def _days(self, start64, end64) -> Iterator:
+        """Yield the days that overlap [start64, end64)."""
+        day = start64.astype("datetime64[D]")
+        while day <= end64.astype("datetime64[D]"):
+            yield day
+            day += np.timedelta64(1, "D")
+
+    def _load(self, period_type: str, region_id: str, day):
+        """Return the memory-mapped rows of a day, if stored."""
+        path = self._path(period_type, region_id, day)
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def _save(self, period_type: str, region_id: str, day, rows) -> None:
+        """Write the rows of a day atomically."""
+        path = self._path(period_type, region_id, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as output:
+            try:
+                np.save(output, rows)
+            except BaseException:
+                output.close()
+                os.unlink(output.name)
+                raise
+        os.replace(output.name, path)
@@ -0,0 +1,228 @@
+"""Transports used by AemoNemData to make HTTP requests."""
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, web
+
+from .constants import EndPoint
+
+
+@dataclass
+class TransportResponse:
+    """Status, headers and raw body of a response."""
+
+    status: int
+    body: bytes
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+class _BytesReader:
+    """Async reader over a buffered body."""
+
+    def __init__(self, body: bytes):
+        self._body = memoryview(body)
+        self._position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes."""
+        if size < 0:
+            size = len(self._body) - self._position
+        chunk = self._body[self._position:self._position + size]
+        self._position += len(chunk)
+        return bytes(chunk)
+
+
+class Transport:
+    """Make HTTP requests for AemoNemData.
+
+    Subclasses implement ``request``. ``stream`` yields the status and an
+    object with an async ``read(size)`` method, and defaults to buffering
+    the result of ``request``.
+    """
+
+    async def request(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> TransportResponse:
+        """Make a request and return the buffered response."""
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> AsyncIterator[tuple[int, Any]]:
+        """Make a request and yield the status and a reader for the body."""
+        response = await self.request(method, url, headers, **kwargs)
+        yield response.status, _BytesReader(response.body)
+
+    async def close(self) -> None:
+        """Release any resources held by the transport."""
+
+
+class AiohttpTransport(Transport):
+    """Transport over an aiohttp ClientSession."""
+
+    def __init__(self, session: Callable[[], ClientSession], timeout: ClientTimeout = None):
+        self._session = session
+        self._timeout = timeout
+
+    async def request(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> TransportResponse:
+        """Make a request and return the buffered response."""
+        async with self._session().request(
+                method,
+                url,
+                headers=headers,
+                timeout=self._timeout,
+                **kwargs
+            ) as resp:
+            return TransportResponse(resp.status, await resp.read(), resp.headers)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> AsyncIterator[tuple[int, Any]]:
+        """Make a request and yield the status and the response content stream."""
+        async with self._session().request(
+                method,
+                url,
+                headers=headers,
+                timeout=self._timeout,
+                **kwargs
+            ) as resp:
+            yield resp.status, resp.content
+
+
+def _endpoint_name(url: str) -> str:
+    """Return the report name at the end of an endpoint url."""
+    return url.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _encode(payload: bytes | str | dict[str, Any]) -> bytes:
+    """Return a payload as JSON bytes."""
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode()
+    return json.dumps(payload).encode()
+
+
+class ReplayTransport(Transport):
+    """Replay recorded payloads instead of calling AEMO.
+
+    Payloads are keyed by EndPoint or by report name (the last part of the
+    endpoint url, for example ``NEM_DASHBOARD_CUMUL_PRICE``) and may be
+    bytes, str or a decoded dict. Unknown urls get a 404 response. Each
+    request is recorded in ``calls`` as (method, report name).
+    """
+
+    def __init__(self, payloads: Mapping[EndPoint | str, bytes | str | dict[str, Any]]):
+        self._payloads = {
+            _endpoint_name(str(key)): _encode(payload)
+            for key, payload in payloads.items()
+        }
+        self.calls: list[tuple[str, str]] = []
+
+    @classmethod
+    def from_directory(cls, path: str | Path) -> "ReplayTransport":
+        """Load ``<report name>.json`` files from a directory."""
+        return cls({
+            file.stem: file.read_bytes()
+            for file in Path(path).glob('*.json')
+        })
+
+    def set_payload(self, key: EndPoint | str, payload: bytes | str | dict[str, Any]) -> None:
+        """Replace the payload for an endpoint."""
+        self._payloads[_endpoint_name(str(key))] = _encode(payload)
+
+    async def request(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> TransportResponse:
+        """Return the recorded payload for the url."""
+        name = _endpoint_name(url)
+        self.calls.append((method, name))
+        if name not in self._payloads:
+            return TransportResponse(404, f'No payload recorded for {name}'.encode())
+        return TransportResponse(200, self._payloads[name], {'Content-Type': 'application/json'})
+
+
+@dataclass
+class Fault:
+    """One scripted step of a FaultInjectingTransport.
+
+    The request is delayed by ``delay`` seconds, then ``error`` is raised if
+    set, otherwise a response with ``status`` is returned if set, otherwise
+    the request is passed to the wrapped transport.
+    """
+
+    delay: float = 0
+    status: int | None = None
+    error: BaseException | None = None
+
+
+class FaultInjectingTransport(Transport):
+    """Wrap a transport with scripted latency and failures per endpoint.
+
+    ``faults`` maps an EndPoint or report name to the steps applied to its
+    next requests in order. Once an endpoint's steps are used up its requests
+    pass straight through.
+    """
+
+    def __init__(self, transport: Transport, faults: Mapping[EndPoint | str, Iterable[Fault]] = None):
+        self._transport = transport
+        self._faults: dict[str, list[Fault]] = {}
+        for key, steps in (faults or {}).items():
+            self.add_faults(key, steps)
+
+    def add_faults(self, key: EndPoint | str, steps: Iterable[Fault]) -> None:
+        """Queue steps for an endpoint."""
+        self._faults.setdefault(_endpoint_name(str(key)), []).extend(steps)
+
+    async def _apply(self, url: str) -> TransportResponse | None:
+        """Apply the next step for a url and return a scripted response, if any."""
+        steps = self._faults.get(_endpoint_name(url))
+        if not steps:
+            return None
+        fault = steps.pop(0)
+        if fault.delay:
+            await asyncio.sleep(fault.delay)
+        if fault.error is not None:
+            raise fault.error
+        if fault.status is not None:
+            return TransportResponse(fault.status, b'Injected fault')
+        return None
+
+    async def request(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> TransportResponse:
+        """Apply the next step for the url, then pass the request on."""
+        response = await self._apply(url)
+        if response is not None:
+            return response
+        return await self._transport.request(method, url, headers, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, headers: dict[str, Any], **kwargs) -> AsyncIterator[tuple[int, Any]]:
+        """Apply the next step for the url, then pass the stream on."""
+        response = await self._apply(url)
+        if response is not None:
+            yield response.status, _BytesReader(response.body)
+            return
+        async with self._transport.stream(method, url, headers, **kwargs) as result:
+            yield result
+
+    async def close(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.close()
+
+
+def create_replay_app(payloads: Mapping[EndPoint | str, bytes | str | dict[str, Any]]) -> web.Application:
+    """Return an aiohttp application that serves recorded payloads.
+
+    Every path ending in a known report name returns its payload, so the
+    application can stand in for the AEMO server in tests.
+    """
+    encoded = {_endpoint_name(str(key)): _encode(payload) for key, payload in payloads.items()}
+
+    async def handler(request: web.Request) -> web.Response:
+        name = _endpoint_name(request.path)
+        if name not in encoded:
+            return web.Response(status=404, text=f'No payload recorded for {name}')
+        return web.Response(body=encoded[name], content_type='application/json')
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    return app
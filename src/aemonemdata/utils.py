@@ -2,6 +2,8 @@
 
 from datetime import datetime, timedelta, timezone
 
+from .constants import DISPATCH_PUBLISH_OFFSET
+
 
 def current_30min_window():
     """Returns the start and end of the current 30 minute window."""
@@ -20,3 +22,25 @@ def current_30min_window():
         )
     current_30min_window_end = current_30min_window_start + timedelta(minutes=30)
     return current_30min_window_start, current_30min_window_end
+
+
+def current_5min_window(now: datetime | None = None):
+    """Returns the start and end of the current 5 minute dispatch interval."""
+    current_time = now if now is not None else datetime.now(timezone.utc)
+    current_5min_window_start = current_time - timedelta(
+        minutes=current_time.minute % 5,
+        seconds=current_time.second,
+        microseconds=current_time.microsecond,
+    )
+    current_5min_window_end = current_5min_window_start + timedelta(minutes=5)
+    return current_5min_window_start, current_5min_window_end
+
+
+def next_publish_time(now: datetime | None = None, publish_offset: timedelta = DISPATCH_PUBLISH_OFFSET):
+    """Returns when AEMO is next expected to publish a dispatch interval."""
+    current_time = now if now is not None else datetime.now(timezone.utc)
+    current_5min_window_start, current_5min_window_end = current_5min_window(current_time)
+    publish_time = current_5min_window_start + publish_offset
+    if publish_time <= current_time:
+        publish_time = current_5min_window_end + publish_offset
+    return publish_time
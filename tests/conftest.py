@@ -0,0 +1,41 @@
+"""Shared fixtures for the aemonemdata tests."""
+from datetime import timedelta
+
+import pytest
+
+from aemonemdata import AemoNemData, EndPoint, ReplayTransport, ResponseCache
+from aemonemdata.benchmark import generate_payloads
+from aemonemdata.scheduler import RequestScheduler, RetryPolicy
+
+
+@pytest.fixture
+def payloads():
+    """Return synthetic payloads for three regions up to the current dispatch interval."""
+    return generate_payloads(48, 3)
+
+
+@pytest.fixture
+def transport(payloads):
+    """Return a ReplayTransport over the payloads."""
+    return ReplayTransport(payloads)
+
+
+@pytest.fixture
+def no_cache():
+    """Return a factory of caches that expire every entry immediately."""
+
+    def make() -> ResponseCache:
+        return ResponseCache(ttl={endpoint: timedelta(0) for endpoint in EndPoint})
+
+    return make
+
+
+@pytest.fixture
+def make_client(no_cache):
+    """Return a factory of clients without caching or retry delays."""
+
+    def make(transport, cache=None, **kwargs) -> AemoNemData:
+        kwargs.setdefault("scheduler", RequestScheduler(RetryPolicy(attempts=2, base_delay=0)))
+        return AemoNemData(transport=transport, cache=cache if cache is not None else no_cache(), **kwargs)
+
+    return make
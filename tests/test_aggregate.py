@@ -0,0 +1,117 @@
+"""aggregate_30min over a small hand-built block."""
+import asyncio
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import aemonemdata.aemonem
+from aemonemdata import EndPoint, ReplayTransport, aggregate_30min
+from aemonemdata.benchmark import generate_payloads
+from aemonemdata.columnar import CumulPriceBlock
+from aemonemdata.constants import NEM_TIMEZONE
+
+START = datetime(2024, 11, 10, 10, 0, tzinfo=NEM_TIMEZONE)
+
+
+def actual(region_id, settlement, price, cumulative):
+    return {"DT": settlement, "R": region_id, "P": price, "CP": cumulative, "A": 1}
+
+
+def forecast(region_id, settlement, price):
+    return {"DT": settlement, "R": region_id, "P": price, "CP": 0.0, "A": 0}
+
+
+@pytest.fixture
+def block():
+    """Return NSW1 with a full, an empty and a partial interval, and VIC1 with one actual.
+
+    The NSW1 actuals settle 10:05 to 10:30 and 11:05 to 11:10, with
+    forecasts for the intervals starting 10:30 and 11:00.
+    """
+    return CumulPriceBlock([
+        actual("NSW1", "2024-11-10T10:05:00", 10.0, 100.0),
+        actual("NSW1", "2024-11-10T10:10:00", 20.0, 200.0),
+        actual("NSW1", "2024-11-10T10:15:00", 30.0, 300.0),
+        actual("NSW1", "2024-11-10T10:20:00", 40.0, 400.0),
+        actual("NSW1", "2024-11-10T10:25:00", 50.0, 500.0),
+        actual("NSW1", "2024-11-10T10:30:00", 60.0, 600.0),
+        forecast("NSW1", "2024-11-10T11:00:00", 90.0),
+        actual("NSW1", "2024-11-10T11:05:00", 70.0, 700.0),
+        actual("NSW1", "2024-11-10T11:10:00", 80.0, 800.0),
+        forecast("NSW1", "2024-11-10T11:30:00", 100.0),
+        actual("VIC1", "2024-11-10T10:30:00", 5.0, 5.0),
+    ])
+
+
+def row(values, index):
+    """Return a row as a list with NaN as None."""
+    return [None if math.isnan(value) else value for value in values[index].tolist()]
+
+
+def test_aggregate(block):
+    # The start is floored to the trading interval.
+    result = aggregate_30min(block, START + timedelta(minutes=10), START + timedelta(minutes=90))
+    nsw, vic = result.regions.index("NSW1"), result.regions.index("VIC1")
+    assert [str(start) for start in result.start] == [
+        "2024-11-10T10:00:00", "2024-11-10T10:30:00", "2024-11-10T11:00:00",
+    ]
+    assert result.count[nsw].tolist() == [6, 0, 2]
+    assert row(result.average, nsw) == [35.0, None, 75.0]
+    assert row(result.forecast, nsw) == [None, 90.0, 100.0]
+    assert row(result.estimated, nsw) == [35.0, 90.0, pytest.approx((150.0 + 4 * 100.0) / 6)]
+    assert row(result.cumulative, nsw) == [600.0, None, 800.0]
+    assert result.count[vic].tolist() == [1, 0, 0]
+    assert row(result.average, vic) == [5.0, None, None]
+    assert row(result.estimated, vic) == [None, None, None]
+    assert row(result.cumulative, vic) == [5.0, None, None]
+
+
+def test_rolling_sum(block):
+    end = START + timedelta(minutes=90)
+    result = aggregate_30min(block, START, end, cumulative_window=6)
+    nsw, vic = result.regions.index("NSW1"), result.regions.index("VIC1")
+    assert row(result.rolling_sum, nsw) == [210.0, None, 150.0]
+    assert row(result.rolling_sum, vic) == [5.0, None, None]
+    # The default window reaches back past the first VIC1 row, but not into NSW1.
+    result = aggregate_30min(block, START, end)
+    assert row(result.rolling_sum, nsw) == [210.0, 210.0, 360.0]
+    assert row(result.rolling_sum, vic) == [5.0, 5.0, 5.0]
+
+
+def test_as_dicts(block):
+    intervals = aggregate_30min(block, START, START + timedelta(minutes=30)).as_dicts("NSW1")
+    assert intervals == [{
+        "start_time": START,
+        "end_time": START + timedelta(minutes=30),
+        "periods": 6,
+        "average": 0.035,
+        "forecast": None,
+        "estimated": 0.035,
+        "cumulative_price": 600.0,
+        "rolling_sum": 210.0,
+    }]
+
+
+def test_empty_span(block):
+    result = aggregate_30min(block, START, START)
+    assert result.count.shape == (2, 0)
+
+
+def test_matches_get_aemo_data(make_client, monkeypatch):
+    now = datetime(2024, 11, 10, 10, 17, tzinfo=NEM_TIMEZONE)
+    window = (START, START + timedelta(minutes=30))
+    monkeypatch.setattr(aemonemdata.aemonem, "current_30min_window", lambda: window)
+    payloads = generate_payloads(48, 3, now)
+    results = asyncio.run(make_client(ReplayTransport(payloads)).get_aemo_data(["nsw", "qld", "vic"]))
+    block = CumulPriceBlock(payloads[EndPoint.API_CUMULATIVE_PRICE_URL]["NEM_DASHBOARD_CUMUL_PRICE"])
+    intervals = aggregate_30min(block, *window)
+    for region_id, data in results["current_30min_forecast"].items():
+        current, = intervals.as_dicts(region_id)
+        assert data["periods_of_current_30min"] == current["periods"] == 3
+        assert data["current_30min_avg"] == pytest.approx(current["average"])
+        assert data["current_30min_forecast"] == pytest.approx(current["forecast"])
+        assert data["current_30min_estimated"] == pytest.approx(current["estimated"])
+        assert data["current_cumulative_price"] == round(current["cumulative_price"])
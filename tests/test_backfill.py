@@ -0,0 +1,145 @@
+"""Backfill over a ReplayTransport."""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import aiohttp
+import pytest
+
+from aemonemdata import Backfill, EndPoint, Fault, FaultInjectingTransport
+from aemonemdata.backfill import CHECKPOINT_FILE, _RateLimiter
+from aemonemdata.benchmark import generate_payloads
+from aemonemdata.constants import NEM_TIMEZONE
+
+REPORTS = ("5MIN", "NEM_DASHBOARD_CUMUL_PRICE")
+
+
+@pytest.fixture
+def start():
+    """Return an hour boundary before the 48 actual intervals of the payloads."""
+    now = datetime.now(NEM_TIMEZONE)
+    return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=4)
+
+
+def lines(directory, report, region_id):
+    """Return the records written for a report and region."""
+    return [
+        json.loads(line)
+        for path in sorted((directory / report / region_id).glob('*.jsonl'))
+        for line in path.read_text(encoding='utf-8').splitlines()
+    ]
+
+
+def test_chunks(make_client, transport, start, tmp_path):
+    backfill = Backfill(make_client(transport), start, start + timedelta(hours=2, minutes=30), tmp_path, chunk=timedelta(hours=1))
+    assert backfill.chunks() == [
+        (start, start + timedelta(hours=1)),
+        (start + timedelta(hours=1), start + timedelta(hours=2)),
+        (start + timedelta(hours=2), start + timedelta(hours=2, minutes=30)),
+    ]
+    with pytest.raises(ValueError):
+        Backfill(make_client(transport), start, start, tmp_path, chunk=timedelta(0))
+
+
+def test_backfill_writes_and_resumes(make_client, transport, start, tmp_path):
+    end = start + timedelta(hours=6)
+
+    def publish(now):
+        """Publish 60 actual intervals up to now."""
+        for endpoint, payload in generate_payloads(60, 3, now).items():
+            transport.set_payload(endpoint, payload)
+
+    def backfill():
+        return Backfill(make_client(transport), start, end, tmp_path, ["nsw", "vic"], timedelta(hours=1), rate=0)
+
+    # Actuals from start - 55 minutes to start + 4 hours.
+    publish(start + timedelta(hours=4, minutes=2))
+    result = asyncio.run(backfill().run())
+    assert result == {"completed": 4, "incomplete": 2, "skipped": 0, "errors": {}}
+    for report in REPORTS:
+        for region_id in ("NSW1", "VIC1"):
+            assert len(lines(tmp_path, report, region_id)) == 49
+        assert not (tmp_path / report / "QLD1").exists()
+    checkpoint = json.loads((tmp_path / CHECKPOINT_FILE).read_text(encoding='utf-8'))
+    assert checkpoint["regions"] == ["NSW1", "VIC1"]
+    assert checkpoint["source"] == "aemonemdata.backfill.DashboardSource"
+    assert checkpoint["completed"] == [f'{start + timedelta(hours=hours):%Y%m%dT%H%M}' for hours in range(4)]
+    assert not list(tmp_path.rglob('*.part'))
+
+    # The chunks from start + 4 hours are fetched again until they are published.
+    calls = len(transport.calls)
+    result = asyncio.run(backfill().run())
+    assert result == {"completed": 0, "incomplete": 2, "skipped": 4, "errors": {}}
+    assert len(transport.calls) > calls
+
+    publish(start + timedelta(hours=6, minutes=2))
+    result = asyncio.run(backfill().run())
+    assert result == {"completed": 2, "incomplete": 0, "skipped": 4, "errors": {}}
+    for region_id in ("NSW1", "VIC1"):
+        assert len(lines(tmp_path, "5MIN", region_id)) == 72
+    calls = len(transport.calls)
+    result = asyncio.run(backfill().run())
+    assert result == {"completed": 0, "incomplete": 0, "skipped": 6, "errors": {}}
+    assert len(transport.calls) == calls
+
+
+def test_failed_chunks_are_retried(make_client, transport, start, tmp_path):
+    error = aiohttp.ClientConnectionError("down")
+    faults = FaultInjectingTransport(transport, {EndPoint.API_5MIN_URL: [Fault(error=error)] * 2})
+    end = start + timedelta(hours=2)
+
+    def backfill():
+        return Backfill(make_client(faults), start, end, tmp_path, ["nsw"], timedelta(hours=1), rate=0)
+
+    result = asyncio.run(backfill().run())
+    assert result["completed"] == 0
+    assert len(result["errors"]) == 2
+    assert not list(tmp_path.rglob('*.jsonl*'))
+
+    result = asyncio.run(backfill().run())
+    assert result["completed"] + result["incomplete"] == 2
+    assert not result["errors"]
+
+
+@pytest.mark.parametrize("changed", [{"regions": ["vic"]}, {"source": "archive"}])
+def test_checkpoint_mismatch(make_client, transport, start, tmp_path, changed):
+
+    async def archive(client, chunk_start, chunk_end, regions):
+        yield "5MIN", {"REGIONID": regions[0], "SETTLEMENTDATE": chunk_start}
+
+    # The payloads cover this hour, so the first run checkpoints it.
+    chunk_start, end = start + timedelta(hours=1), start + timedelta(hours=2)
+    options = {"regions": ["nsw"], "source": None}
+    result = asyncio.run(Backfill(make_client(transport), chunk_start, end, tmp_path, rate=0, **options).run())
+    assert result["completed"] == 1
+    options.update(changed)
+    if options["source"] == "archive":
+        options["source"] = archive
+    with pytest.raises(ValueError, match="Checkpoint"):
+        asyncio.run(Backfill(make_client(transport), chunk_start, end, tmp_path, rate=0, **options).run())
+
+
+def test_source_without_coverage_is_checkpointed(make_client, transport, start, tmp_path):
+
+    async def archive(client, chunk_start, chunk_end, regions):
+        yield "5MIN", {"REGIONID": regions[0], "SETTLEMENTDATE": chunk_start}
+
+    end = start + timedelta(days=2)
+    backfill = Backfill(make_client(transport), start, end, tmp_path, ["sa"], timedelta(days=1), rate=0, source=archive)
+    assert asyncio.run(backfill.run()) == {"completed": 2, "incomplete": 0, "skipped": 0, "errors": {}}
+    checkpoint = json.loads((tmp_path / CHECKPOINT_FILE).read_text(encoding='utf-8'))
+    assert checkpoint["source"].endswith("archive")
+    assert len(lines(tmp_path, "5MIN", "SA1")) == 2
+
+
+def test_rate_limiter():
+
+    async def run():
+        limiter = _RateLimiter(20)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(3):
+            await limiter.wait()
+        return loop.time() - started
+
+    assert asyncio.run(run()) >= 0.09
@@ -0,0 +1,81 @@
+"""Benchmarks of the parsing pipeline, parameterized by payload size and region count."""
+import os
+from pathlib import Path
+
+import pytest
+
+from aemonemdata.benchmark import (
+    FORECAST_PERIODS,
+    bench_aggregate,
+    bench_get_aemo_data,
+    bench_import,
+    bench_parse,
+    generate_payloads,
+)
+from aemonemdata.columnar import HAS_NUMPY
+from aemonemdata.constants import REGIONS, EndPoint
+
+INTERVALS = [12, 288]
+REGION_COUNTS = [1, len(REGIONS)]
+ROUNDS = 3
+
+
+def check_measurement(result):
+    """Check the fields every benchmark reports."""
+    assert 0 < result["min_s"] <= result["median_s"]
+    assert 0 <= result["retained_bytes"] <= result["peak_bytes"]
+
+
+@pytest.mark.parametrize("regions", REGION_COUNTS)
+@pytest.mark.parametrize("intervals", INTERVALS)
+def test_generate_payloads(intervals, regions):
+    payloads = generate_payloads(intervals, regions)
+    records = payloads[EndPoint.API_CUMULATIVE_PRICE_URL]["NEM_DASHBOARD_CUMUL_PRICE"]
+    assert len(records) == regions * (intervals + FORECAST_PERIODS)
+    assert len({record["R"] for record in records}) == regions
+    assert len(payloads[EndPoint.API_ELEC_NEM_SUMMARY_URL]["ELEC_NEM_SUMMARY"]) == regions
+
+
+@pytest.mark.parametrize("warm", [False, True], ids=["cold", "warm"])
+@pytest.mark.parametrize("regions", REGION_COUNTS)
+@pytest.mark.parametrize("intervals", INTERVALS)
+def test_bench_get_aemo_data(intervals, regions, warm):
+    result = bench_get_aemo_data(intervals, regions, ROUNDS, warm=warm)
+    check_measurement(result)
+    assert result["regions"] == regions
+    assert result["requests"] == 3
+    # A warm instance has already merged the unchanged payload.
+    assert result["regions_changed"] == (0 if warm else regions)
+
+
+@pytest.mark.parametrize("regions", REGION_COUNTS)
+@pytest.mark.parametrize("intervals", INTERVALS)
+def test_bench_parse(intervals, regions):
+    results = bench_parse(intervals, regions, ROUNDS)
+    expected = {"records", "interval_store"} | ({"columnar"} if HAS_NUMPY else set())
+    assert set(results) == expected
+    for result in results.values():
+        check_measurement(result)
+        assert result["per_1k_records_s"] > 0
+    records = regions * (intervals + FORECAST_PERIODS)
+    assert results["records"]["parsed"] == records
+    assert results["interval_store"]["parsed"] == regions * intervals
+    if HAS_NUMPY:
+        assert results["columnar"]["parsed"] == records
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="requires numpy")
+@pytest.mark.parametrize("regions", REGION_COUNTS)
+@pytest.mark.parametrize("intervals", INTERVALS)
+def test_bench_aggregate(intervals, regions):
+    result = bench_aggregate(intervals, regions, ROUNDS)
+    check_measurement(result)
+    assert result["per_1k_records_s"] > 0
+    assert result["periods"] == regions * intervals
+
+
+def test_bench_import(monkeypatch):
+    source = str(Path(__file__).parents[1] / "src")
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")])))
+    result = bench_import("import aemonemdata.core", rounds=1)
+    assert result["min_s"] == result["median_s"] > 0
@@ -0,0 +1,286 @@
+"""Shared response caches over SQLite and the stand-in RESP server."""
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from aemonemdata import (
+    BaseResponseCache,
+    CacheEntry,
+    EndPoint,
+    RedisResponseCache,
+    ReplayTransport,
+    ResponseCache,
+    SqliteResponseCache,
+    start_resp_server,
+)
+
+LEASE = timedelta(seconds=30)
+
+
+def entry(body: bytes = b'{}', ttl: timedelta = timedelta(minutes=5)) -> CacheEntry:
+    """Return an entry expiring after ttl."""
+    return CacheEntry(body=body, expires=datetime.now(timezone.utc) + ttl, etag='"1"')
+
+
+async def redis_cache(**kwargs) -> tuple[RedisResponseCache, asyncio.Server]:
+    """Return a RedisResponseCache on a new stand-in server."""
+    server = await start_resp_server()
+    return RedisResponseCache(port=server.sockets[0].getsockname()[1], **kwargs), server
+
+
+def backend_factory(kind: str, tmp_path):
+    """Return a coroutine making a factory of caches of one backend, all sharing one store."""
+
+    async def make():
+        if kind == "memory":
+            cache = ResponseCache()
+            return lambda: cache, None
+        if kind == "sqlite":
+            return lambda: SqliteResponseCache(tmp_path / "cache.db"), None
+        server = await start_resp_server()
+        port = server.sockets[0].getsockname()[1]
+        return lambda: RedisResponseCache(port=port), server
+
+    return make
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    """Return a factory of caches of each backend."""
+    return backend_factory(request.param, tmp_path)
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def shared_backend(request, tmp_path):
+    """Return a factory of caches of each backend shared between workers."""
+    return backend_factory(request.param, tmp_path)
+
+
+def test_entry_round_trip():
+    original = entry(b'{"a":\n1}')
+    assert CacheEntry.decode(original.encode()) == original
+
+
+def test_get_set_clear(backend):
+
+    async def run():
+        make, server = await backend()
+        writer, reader = make(), make()
+        try:
+            assert await reader.async_get("key") is None
+            stored = entry()
+            await writer.async_set("key", stored)
+            found = await reader.async_get("key")
+            await writer.async_clear()
+            return stored, found, await reader.async_get("key")
+        finally:
+            await writer.async_close()
+            await reader.async_close()
+            if server is not None:
+                server.close()
+
+    stored, found, cleared = asyncio.run(run())
+    assert found == stored
+    assert cleared is None
+
+
+def test_one_lease_per_key(shared_backend):
+
+    async def run():
+        make, server = await shared_backend()
+        first, second = make(), make()
+        try:
+            token = await first.async_acquire("key", LEASE)
+            refused = await second.async_acquire("key", LEASE)
+            other = await second.async_acquire("other", LEASE)
+            await first.async_release("key", "not the token")
+            still_refused = await second.async_acquire("key", LEASE)
+            await first.async_release("key", token)
+            granted = await second.async_acquire("key", LEASE)
+            return token, refused, other, still_refused, granted
+        finally:
+            await first.async_close()
+            await second.async_close()
+            if server is not None:
+                server.close()
+
+    token, refused, other, still_refused, granted = asyncio.run(run())
+    assert token is not None and other is not None and granted is not None
+    assert refused is None and still_refused is None
+
+
+def test_expired_lease_is_granted(tmp_path):
+
+    async def run():
+        cache = SqliteResponseCache(tmp_path / "cache.db")
+        await cache.async_acquire("key", timedelta(0))
+        granted = await cache.async_acquire("key", LEASE)
+        await cache.async_close()
+        redis, server = await redis_cache()
+        await redis.async_acquire("key", timedelta(milliseconds=1))
+        await asyncio.sleep(0.01)
+        redis_granted = await redis.async_acquire("key", LEASE)
+        await redis.async_close()
+        server.close()
+        return granted, redis_granted
+
+    granted, redis_granted = asyncio.run(run())
+    assert granted is not None and redis_granted is not None
+
+
+@pytest.mark.parametrize("make", [RedisResponseCache, lambda: SqliteResponseCache(":memory:")])
+def test_shared_caches_are_async_only(make):
+    cache = make()
+    assert isinstance(cache, BaseResponseCache)
+    assert not isinstance(cache, ResponseCache)
+    assert not hasattr(cache, "get")
+
+
+def test_sqlite_lock_wait_does_not_block_the_loop(tmp_path):
+    path = tmp_path / "cache.db"
+
+    async def run():
+        cache = SqliteResponseCache(path)
+        other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        other.execute('BEGIN IMMEDIATE')
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.2, other.execute, 'COMMIT')
+        acquire = asyncio.ensure_future(cache.async_acquire("key", LEASE))
+        ticks = 0
+        while not acquire.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        other.close()
+        await cache.async_close()
+        return ticks, acquire.result()
+
+    ticks, token = asyncio.run(asyncio.wait_for(run(), 5))
+    assert ticks >= 5
+    assert token is not None
+
+
+def test_redis_unavailable_acts_as_empty():
+
+    async def run():
+        server = await start_resp_server()
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        cache = RedisResponseCache(port=port)
+        await cache.async_set("key", entry())
+        result = await cache.async_get("key"), await cache.async_acquire("key", LEASE)
+        await cache.async_clear()
+        await cache.async_close()
+        return result
+
+    found, token = asyncio.run(run())
+    assert found is None
+    assert token is not None
+
+
+def test_redis_clear_keeps_other_prefixes():
+
+    async def run():
+        cache, server = await redis_cache(prefix='a:')
+        other = RedisResponseCache(port=server.sockets[0].getsockname()[1], prefix='b:')
+        await cache.async_set("key", entry())
+        await other.async_set("key", entry())
+        await cache.async_clear()
+        result = await cache.async_get("key"), await other.async_get("key")
+        await cache.async_close()
+        await other.async_close()
+        server.close()
+        return result
+
+    cleared, kept = asyncio.run(run())
+    assert cleared is None
+    assert kept is not None
+
+
+async def start_silent_server() -> asyncio.Server:
+    """Start a server that accepts connections and never replies."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while await reader.read(1024):
+            pass
+        writer.close()
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def test_redis_silent_server_times_out():
+
+    async def run():
+        server = await start_silent_server()
+        cache = RedisResponseCache(port=server.sockets[0].getsockname()[1], timeout=0.05)
+        result = await cache.async_get("key"), await cache.async_acquire("key", LEASE)
+        await cache.async_close()
+        server.close()
+        return result
+
+    found, token = asyncio.run(asyncio.wait_for(run(), 5))
+    assert found is None
+    assert token is not None
+
+
+def test_get_aemo_data_with_silent_redis(transport, make_client):
+
+    async def run():
+        server = await start_silent_server()
+        cache = RedisResponseCache(port=server.sockets[0].getsockname()[1], timeout=0.05)
+        results = await make_client(transport, cache).get_aemo_data(["nsw"])
+        await cache.async_close()
+        server.close()
+        return results
+
+    results = asyncio.run(asyncio.wait_for(run(), 10))
+    assert "NSW1" in results["current_30min_forecast"]
+
+
+def delayed_acquire(cache: BaseResponseCache, ready: asyncio.Event) -> BaseResponseCache:
+    """Make the leases of cache wait for ready."""
+    acquire = cache.async_acquire
+
+    async def async_acquire(key: str, lease: timedelta) -> str | None:
+        await ready.wait()
+        return await acquire(key, lease)
+
+    cache.async_acquire = async_acquire
+    return cache
+
+
+def test_lease_taken_after_another_worker_fetched(shared_backend, payloads, make_client):
+    # Worker B finds the expired entries, then only takes the lease after
+    # worker A has fetched, stored and released them.
+    expired = {endpoint: timedelta(0) for endpoint in EndPoint}
+
+    async def run():
+        make, server = await shared_backend()
+        expire, cache, delayed = make(), make(), make()
+        try:
+            expire._ttl.update(expired)
+            await make_client(ReplayTransport(payloads), expire).get_aemo_data(["nsw"])
+            ready = asyncio.Event()
+            first, second = ReplayTransport(payloads), ReplayTransport(payloads)
+
+            async def fetch_first():
+                results = await make_client(first, cache).get_aemo_data(["nsw"])
+                ready.set()
+                return results
+
+            results = await asyncio.gather(
+                fetch_first(),
+                make_client(second, delayed_acquire(delayed, ready)).get_aemo_data(["nsw"]),
+            )
+            return len(first.calls), len(second.calls), results
+        finally:
+            for shared in (expire, cache, delayed):
+                await shared.async_close()
+            if server is not None:
+                server.close()
+
+    first_calls, second_calls, (first, second) = asyncio.run(asyncio.wait_for(run(), 10))
+    assert (first_calls, second_calls) == (3, 0)
+    assert first["current_30min_forecast"] == second["current_30min_forecast"]
@@ -0,0 +1,71 @@
+"""AemoNemHub refreshes over a ReplayTransport."""
+import asyncio
+import copy
+from datetime import datetime, timedelta
+
+import aiohttp
+
+import aemonemdata.aemonem
+import aemonemdata.hub
+from aemonemdata import AemoNemHub, EndPoint, Fault, FaultInjectingTransport
+
+
+def test_refresh_pushes_subscribed_regions(transport, no_cache):
+    hub = AemoNemHub(cache=no_cache(), transport=transport)
+    received = []
+    hub.subscribe(["nsw"], received.append)
+    unsubscribe = hub.subscribe(["qld", "vic"], received.append)
+    asyncio.run(hub.refresh())
+    assert [set(data) for data in received] == [{"NSW1"}, {"QLD1", "VIC1"}]
+    assert len(transport.calls) == 3
+    unsubscribe()
+    asyncio.run(hub.refresh())
+    assert set(received[-1]) == {"NSW1"}
+
+
+def test_run_survives_transport_errors(transport, no_cache, monkeypatch):
+    error = aiohttp.ClientConnectionError("down")
+    faults = FaultInjectingTransport(transport, {EndPoint.API_CUMULATIVE_PRICE_URL: [Fault(error=error)] * 3})
+    hub = AemoNemHub(cache=no_cache(), transport=faults)
+    received = []
+    hub.subscribe(["nsw"], received.append)
+    monkeypatch.setattr(aemonemdata.hub, "SUBSCRIBE_RETRY_MIN", 0)
+
+    async def run():
+        task = asyncio.ensure_future(hub.run())
+        while not received:
+            assert not task.done(), task.exception()
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert set(received[0]) == {"NSW1"}
+
+
+def test_run_waits_for_a_new_dispatch_interval(payloads, transport, no_cache, monkeypatch):
+    monkeypatch.setattr(aemonemdata.aemonem, "next_publish_time", lambda now, offset: now)
+    monkeypatch.setattr(aemonemdata.aemonem, "SUBSCRIBE_RETRY_MIN", 0.01)
+    hub = AemoNemHub(cache=no_cache(), transport=transport)
+    received = []
+    hub.subscribe(["nsw"], received.append)
+    summary = payloads[EndPoint.API_ELEC_NEM_SUMMARY_URL]
+
+    async def run():
+        task = asyncio.ensure_future(hub.run())
+        while not received:
+            await asyncio.sleep(0.01)
+        # The same interval is polled for, but not pushed again.
+        await asyncio.sleep(0.2)
+        pushed = len(received)
+        published = copy.deepcopy(summary)
+        for record in published["ELEC_NEM_SUMMARY"]:
+            record["SETTLEMENTDATE"] = (datetime.fromisoformat(record["SETTLEMENTDATE"]) + timedelta(minutes=5)).isoformat()
+        transport.set_payload(EndPoint.API_ELEC_NEM_SUMMARY_URL, published)
+        while len(received) == pushed:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        return pushed
+
+    pushed = asyncio.run(asyncio.wait_for(run(), 5))
+    assert pushed == 1
+    assert received[1]["NSW1"]["settlement_date"] - received[0]["NSW1"]["settlement_date"] == timedelta(minutes=5)
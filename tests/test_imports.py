@@ -0,0 +1,34 @@
+"""Optional dependencies are only loaded when used."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SOURCE = str(Path(__file__).parents[1] / "src")
+OPTIONAL = ("numpy", "ijson")
+
+
+def loaded_after(statement: str) -> dict[str, bool]:
+    """Return which optional modules a statement loads in a new interpreter."""
+    code = (
+        f'import sys\nsys.path.insert(0, {SOURCE!r})\n{statement}\n'
+        f'import json\nprint(json.dumps({{name: name in sys.modules for name in {OPTIONAL!r}}}))'
+    )
+    return json.loads(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout)
+
+
+@pytest.mark.parametrize("statement", [
+    "import aemonemdata",
+    "from aemonemdata import AemoNemData",
+    "from aemonemdata import AemoNemHub, Backfill, ResponseCache",
+    "import aemonemdata.core",
+])
+def test_optional_dependencies_not_loaded(statement):
+    assert loaded_after(statement) == {"numpy": False, "ijson": False}
+
+
+def test_columnar_client_loads_numpy():
+    pytest.importorskip("numpy")
+    assert loaded_after("from aemonemdata import AemoNemData\nAemoNemData(columnar=True)")["numpy"]
@@ -0,0 +1,116 @@
+"""IntervalStore merging, revisions and eviction."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from aemonemdata import IntervalStore
+from aemonemdata.constants import NEM_TIMEZONE
+
+START = datetime(2024, 11, 10, 10, 0, tzinfo=NEM_TIMEZONE)
+
+
+def dt(minutes):
+    """Return the AEMO date string minutes after START."""
+    return (START + timedelta(minutes=minutes)).replace(tzinfo=None).isoformat()
+
+
+def actual(region_id, minutes, price, cumulative=0.0):
+    return {"DT": dt(minutes), "R": region_id, "P": price, "CP": cumulative, "A": 1}
+
+
+def forecast(region_id, minutes, price):
+    return {"DT": dt(minutes), "R": region_id, "P": price, "CP": 0.0, "A": 0}
+
+
+def prices(intervals):
+    return [interval.price_mw for interval in intervals]
+
+
+def test_merge_reports_changed_regions():
+    store = IntervalStore()
+    records = [actual("NSW1", 5, 10.0), actual("NSW1", 10, 20.0), actual("VIC1", 5, 30.0), forecast("NSW1", 60, 90.0)]
+    assert store.merge_cumul_price(records) == {"NSW1", "VIC1"}
+    assert len(store) == 3
+    assert store.latest == START + timedelta(minutes=10)
+    # The same payload again changes nothing.
+    assert store.merge_cumul_price(records) == set()
+    # A new actual for one region and a new forecast for the other.
+    assert store.merge_cumul_price(records + [actual("VIC1", 10, 40.0)]) == {"VIC1"}
+    assert store.merge_cumul_price(records[:3] + [forecast("NSW1", 60, 95.0)]) == {"NSW1"}
+    assert prices(store.forecast("NSW1")) == [95.0]
+
+
+def test_revised_interval_replaces_the_old_one():
+    store = IntervalStore()
+    store.merge_cumul_price([actual("NSW1", 5, 10.0, 100.0), actual("NSW1", 10, 20.0, 200.0)])
+    assert store.merge_cumul_price([actual("NSW1", 5, 10.0, 150.0), actual("NSW1", 10, 20.0, 200.0)]) == {"NSW1"}
+    revised, = store.actual("NSW1", end=START + timedelta(minutes=5))
+    assert revised.cumulative_price == 150.0
+    assert store.merge_cumul_price([actual("NSW1", 10, 25.0, 200.0)]) == {"NSW1"}
+    assert len(store) == 2
+    assert prices(store.actual("NSW1")) == [10.0, 25.0]
+    view = store.region_view("NSW1", START, START + timedelta(minutes=30))
+    assert prices(view.window) == [10.0, 25.0]
+    assert view.latest_actual.price_mw == 25.0
+
+
+def test_out_of_order_actuals_are_sorted():
+    store = IntervalStore()
+    store.merge_cumul_price([actual("NSW1", 15, 30.0), actual("NSW1", 5, 10.0)])
+    store.merge_cumul_price([actual("NSW1", 10, 20.0)])
+    assert prices(store.actual("NSW1")) == [10.0, 20.0, 30.0]
+    assert store.latest == START + timedelta(minutes=15)
+
+
+def test_eviction():
+    store = IntervalStore(retention=timedelta(minutes=30))
+    store.merge_cumul_price([actual("NSW1", minutes, minutes) for minutes in range(5, 35, 5)])
+    store.merge_cumul_price([actual("VIC1", 5, 1.0)])
+    assert len(store) == 7
+    store.merge_cumul_price([actual("NSW1", 40, 40.0)])
+    # Actuals more than 30 minutes behind 10:40 are dropped from every region.
+    assert prices(store.actual("NSW1")) == [10.0, 15.0, 20.0, 25.0, 30.0, 40.0]
+    assert store.actual("VIC1") == []
+    assert store.region_view("VIC1", START, START + timedelta(minutes=30)) is None
+    view = store.region_view("NSW1", START, START + timedelta(minutes=30))
+    assert prices(view.window) == [10.0, 15.0, 20.0, 25.0, 30.0]
+
+
+def test_records_older_than_retention_are_skipped():
+    store = IntervalStore(retention=timedelta(minutes=10))
+    assert store.merge_cumul_price([actual("NSW1", 5, 10.0), actual("NSW1", 60, 60.0)]) == {"NSW1"}
+    assert prices(store.actual("NSW1")) == [60.0]
+    # Late rows behind the window do not come back once evicted.
+    assert store.merge_cumul_price([actual("NSW1", 5, 10.0)]) == set()
+    assert len(store) == 1
+
+
+def test_region_view_window_and_forecast():
+    store = IntervalStore()
+    store.merge_cumul_price([
+        actual("NSW1", 5, 10.0),
+        actual("NSW1", 30, 30.0),
+        actual("NSW1", 35, 35.0),
+        forecast("NSW1", 90, 90.0),
+        forecast("NSW1", 60, 60.0),
+    ])
+    view = store.region_view("NSW1", START + timedelta(minutes=30), START + timedelta(minutes=60))
+    # The 10:30 actual starts at 10:25, in the previous trading interval.
+    assert prices(view.window) == [35.0]
+    assert view.latest_actual.price_mw == 35.0
+    assert view.first_forecast.price_mw == 60.0
+    assert prices(view.forecast) == [90.0, 60.0]
+
+
+def test_clear():
+    store = IntervalStore()
+    store.merge_cumul_price([actual("NSW1", 5, 10.0), forecast("NSW1", 60, 60.0)])
+    store.clear()
+    assert len(store) == 0
+    assert store.latest is None
+    assert store.forecast("NSW1") == []
+
+
+def test_unknown_actual_flag():
+    with pytest.raises(ValueError):
+        IntervalStore().merge_cumul_price([{"DT": dt(5), "R": "NSW1", "P": 1.0, "CP": 0.0, "A": 2}])
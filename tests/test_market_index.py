@@ -0,0 +1,133 @@
+"""MarketIndex change detection over ELEC_NEM_SUMMARY payloads."""
+import asyncio
+import copy
+import json
+from unittest import mock
+
+import pytest
+
+import aemonemdata.market_index
+from aemonemdata import EndPoint, MarketIndex
+from aemonemdata.market_index import notice_id
+from aemonemdata.records import InterconnectorFlow
+
+
+def summary_record(region_id, flows, settlement="2024-11-10T10:05:00"):
+    return {
+        "SETTLEMENTDATE": settlement, "REGIONID": region_id, "PRICE": 55.0,
+        "TOTALDEMAND": 5000.0, "NETINTERCHANGE": 10.0, "SCHEDULEDGENERATION": 4000.0,
+        "SEMISCHEDULEDGENERATION": 1000.0, "APCFLAG": 0, "MARKETSUSPENDEDFLAG": 0,
+        "INTERCONNECTORFLOWS": json.dumps(flows),
+    }
+
+
+def flow(name, value, export_limit=500.0, import_limit=-500.0):
+    return {"name": name, "value": value, "exportlimit": export_limit, "importlimit": import_limit}
+
+
+def payload(qni=100.0, heywood=-50.0, notices=()):
+    return {
+        "ELEC_NEM_SUMMARY": [
+            summary_record("NSW1", [flow("N-Q-MNSP1", 10.0), flow("NSW1-QLD1", qni)]),
+            summary_record("VIC1", [flow("V-SA", heywood, 600.0, -400.0), flow("T-V-MNSP1", 0.0)]),
+        ],
+        "ELEC_NEM_SUMMARY_PRICES": [{"REGIONID": "NSW1", "RRP": 55.0}, {"REGIONID": "VIC1", "RRP": 60.0}],
+        "ELEC_NEM_SUMMARY_MARKET_NOTICE": [{"ID": notice, "REASON": str(notice)} for notice in notices],
+    }
+
+
+def kinds(changes):
+    return [(change.kind, change.subject) for change in changes]
+
+
+def test_lookups():
+    index = MarketIndex()
+    assert index.update(payload()) == []
+    assert set(index.summaries) == {"NSW1", "VIC1"}
+    assert index.prices["VIC1"]["RRP"] == 60.0
+    assert sorted(flow.name for flow in index.between("QLD1", "NSW1")) == ["N-Q-MNSP1", "NSW1-QLD1"]
+    assert [flow.name for flow in index.between("SA1", "VIC1")] == ["V-SA"]
+    assert sorted(flow.name for flow in index.for_region("VIC1")) == ["T-V-MNSP1", "V-SA"]
+    assert index.for_region("WA1") == []
+
+
+def test_limit_transitions():
+    index = MarketIndex()
+    index.update(payload())
+    assert kinds(index.update(payload(qni=500.0, heywood=-400.0))) == [
+        ("export_limit", "NSW1-QLD1"), ("import_limit", "V-SA"),
+    ]
+    assert index.update(payload(qni=520.0, heywood=-400.0)) == []
+    change, = index.update(payload(qni=300.0, heywood=-400.0))
+    assert (change.kind, change.subject, change.value) == ("within_limits", "NSW1-QLD1", 300.0)
+    assert change.as_dict()["message"] == "NSW1-QLD1 is back within its limits"
+
+
+def test_flow_at_limit_on_first_payload():
+    assert kinds(MarketIndex().update(payload(qni=600.0))) == [("export_limit", "NSW1-QLD1")]
+
+
+def test_notices_sorted():
+    index = MarketIndex()
+    assert kinds(index.update(payload(notices=[30, 4, 12]))) == [
+        ("new_notice", "12"), ("new_notice", "30"), ("new_notice", "4"),
+    ]
+    assert kinds(index.update(payload(notices=[12, 7]))) == [
+        ("new_notice", "7"), ("removed_notice", "30"), ("removed_notice", "4"),
+    ]
+    assert list(index.notices) == ["12", "7"]
+
+
+def test_notice_without_id():
+    notice = {"REASON": "x" * 500}
+    key = notice_id(notice)
+    assert len(key) == 40
+    assert key == notice_id(dict(notice))
+    assert notice_id({"NOTICEID": 9}) == "9"
+
+
+def test_unchanged_records_are_not_parsed():
+    index = MarketIndex()
+    first = payload()
+    index.update(first)
+    summaries = dict(index.summaries)
+    changed = copy.deepcopy(first)
+    changed["ELEC_NEM_SUMMARY"][1]["TOTALDEMAND"] = 6000.0
+    with mock.patch.object(
+            aemonemdata.market_index, "parse_interconnector_flows", side_effect=AssertionError("parsed"),
+        ):
+        index.update(copy.deepcopy(first))
+        # Only VIC1 changed and its flows are unchanged, so they are reused.
+        index.update(changed)
+    assert index.summaries["NSW1"] is summaries["NSW1"]
+    assert index.summaries["VIC1"].total_demand == 6000.0
+    assert index.summaries["VIC1"].interconnector_flows == summaries["VIC1"].interconnector_flows
+
+
+def test_get_aemo_data_reports_changes(payloads, transport, make_client):
+    client = make_client(transport)
+    summary = payloads[EndPoint.API_ELEC_NEM_SUMMARY_URL]
+
+    async def run():
+        first = await client.get_aemo_data(["nsw"])
+        published = copy.deepcopy(summary)
+        published["ELEC_NEM_SUMMARY_MARKET_NOTICE"] = [{"ID": 1}]
+        transport.set_payload(EndPoint.API_ELEC_NEM_SUMMARY_URL, published)
+        second = await client.get_aemo_data(["nsw"])
+        third = await client.get_aemo_data(["nsw"])
+        return first["changes"], second["changes"], third["changes"]
+
+    first, second, third = asyncio.run(run())
+    assert first == []
+    assert second == [{"kind": "new_notice", "subject": "1", "message": "New market notice 1", "value": None}]
+    assert third == []
+
+
+@pytest.mark.parametrize("name, regions", [
+    ("N-Q-MNSP1", ("NSW1", "QLD1")),
+    ("VIC1-NSW1", ("VIC1", "NSW1")),
+    ("UNKNOWN", (None, None)),
+])
+def test_interconnector_regions(name, regions):
+    parsed = InterconnectorFlow.from_summary(flow(name, 0.0))
+    assert (parsed.from_region, parsed.to_region) == regions
@@ -0,0 +1,39 @@
+"""Session and connector ownership of AemoNemData."""
+import asyncio
+
+import pytest
+from aiohttp import TCPConnector
+
+from aemonemdata import AemoNemData
+
+
+def test_default_connector_is_closed_with_the_session():
+
+    async def run():
+        client = AemoNemData()
+        connector = client._ensure_session().connector
+        await client.close()
+        return connector.closed
+
+    assert asyncio.run(run())
+
+
+def test_supplied_connector_is_left_open():
+
+    async def run():
+        connector = TCPConnector()
+        client = AemoNemData(connector=connector)
+        first = client._ensure_session().connector
+        await client.close()
+        still_open = not connector.closed
+        # A new session after close() reuses the caller's connector.
+        second = client._ensure_session().connector
+        await client.close()
+        await connector.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            client._ensure_session()
+        return first, second, still_open, connector
+
+    first, second, still_open, connector = asyncio.run(run())
+    assert still_open
+    assert first is connector and second is connector
@@ -0,0 +1,130 @@
+"""SnapshotStore merging, de-duplication and warm start."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import aiohttp
+import pytest
+
+pytest.importorskip("numpy")
+
+from aemonemdata import EndPoint, Fault, FaultInjectingTransport, IntervalStore, SnapshotStore
+from aemonemdata.columnar import CumulPriceBlock
+from aemonemdata.constants import NEM_TIMEZONE
+
+START = datetime(2024, 11, 10, 23, 50, tzinfo=NEM_TIMEZONE)
+
+
+def dt(minutes):
+    """Return the AEMO date string minutes after START."""
+    return (START + timedelta(minutes=minutes)).replace(tzinfo=None).isoformat()
+
+
+def actual(region_id, minutes, price, cumulative=0.0):
+    return {"DT": dt(minutes), "R": region_id, "P": price, "CP": cumulative, "A": 1}
+
+
+def forecast(region_id, minutes, price):
+    return {"DT": dt(minutes), "R": region_id, "P": price, "CP": 0.0, "A": 0}
+
+
+def prices(rows):
+    return rows["price"].tolist()
+
+
+def test_append_splits_days_and_reads_ranges(tmp_path):
+    store = SnapshotStore(tmp_path)
+    # 23:55 and 00:00 are on the first NEM day, 00:05 and 00:10 on the next.
+    records = [actual("NSW1", minutes, float(minutes)) for minutes in (5, 10, 15, 20)]
+    assert store.append_block(CumulPriceBlock(records + [forecast("NSW1", 40, 90.0)])) == 5
+    assert sorted(path.name for path in (tmp_path / "actual" / "NSW1").iterdir()) == ["20241110.npy", "20241111.npy"]
+    assert prices(store.read("NSW1", START, START + timedelta(hours=1))) == [5.0, 10.0, 15.0, 20.0]
+    assert prices(store.read("NSW1", START + timedelta(minutes=10), START + timedelta(minutes=20))) == [10.0, 15.0]
+    assert prices(store.read("NSW1", START, START + timedelta(hours=1), "forecast")) == [90.0]
+    assert store.latest("NSW1") == START + timedelta(minutes=20)
+    assert store.regions() == ["NSW1"]
+    assert store.read("VIC1", START, START + timedelta(hours=1)).size == 0
+
+
+def test_later_rows_win_and_unchanged_days_are_not_rewritten(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.append_block(CumulPriceBlock([actual("NSW1", 5, 10.0, 100.0), actual("NSW1", 15, 30.0, 300.0)]))
+    day = tmp_path / "actual" / "NSW1" / "20241111.npy"
+    written = day.stat().st_mtime_ns
+    assert store.append_block(CumulPriceBlock([actual("NSW1", 15, 30.0, 300.0)])) == 0
+    assert day.stat().st_mtime_ns == written
+    # A revised row replaces the stored one, with duplicates in one payload
+    # resolved to the last.
+    store.append_block(CumulPriceBlock([actual("NSW1", 15, 31.0, 310.0), actual("NSW1", 15, 32.0, 320.0)]))
+    rows = store.read("NSW1", START, START + timedelta(hours=1))
+    assert prices(rows) == [10.0, 32.0]
+    assert rows["cumulative"].tolist() == [100.0, 320.0]
+    intervals = store.intervals("NSW1", START, START + timedelta(hours=1))
+    assert [interval.price_mw for interval in intervals] == [10.0, 32.0]
+    assert intervals[1].settlement_date == START + timedelta(minutes=15)
+    assert not list(tmp_path.rglob('*.tmp'))
+
+
+def test_concurrent_appends_keep_every_row(tmp_path):
+    store = SnapshotStore(tmp_path)
+    blocks = [CumulPriceBlock([actual("NSW1", minutes, float(minutes))]) for minutes in range(15, 75, 5)]
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(store.append_block, blocks))
+    assert prices(store.read("NSW1", START, START + timedelta(hours=2))) == [float(minutes) for minutes in range(15, 75, 5)]
+    assert not list(tmp_path.rglob('*.tmp'))
+
+
+def test_block_round_trip(tmp_path):
+    store = SnapshotStore(tmp_path)
+    records = [actual("NSW1", 5, 10.0), actual("VIC1", 5, 20.0), forecast("VIC1", 40, 30.0)]
+    store.append_block(CumulPriceBlock(records))
+    block = store.block(START, START + timedelta(hours=1))
+    view = block.region_view("VIC1", START, START + timedelta(minutes=30))
+    assert [interval.price_mw for interval in view.window] == [20.0]
+    assert view.first_forecast.price_mw == 30.0
+
+
+def test_warm_start(tmp_path):
+    snapshot = SnapshotStore(tmp_path)
+    snapshot.append_block(CumulPriceBlock([
+        actual("NSW1", 5, 10.0),
+        actual("NSW1", 60, 60.0),
+        actual("NSW1", 65, 65.0),
+        actual("VIC1", 65, 5.0),
+        forecast("NSW1", 60, 1.0),
+        forecast("NSW1", 90, 90.0),
+    ]))
+    store = IntervalStore(retention=timedelta(minutes=30))
+    assert snapshot.warm_start(store) == 3
+    # Actuals behind the retention window and forecasts already settled are left out.
+    assert [interval.price_mw for interval in store.actual("NSW1")] == [60.0, 65.0]
+    assert [interval.price_mw for interval in store.forecast("NSW1")] == [90.0]
+    assert store.latest == START + timedelta(minutes=65)
+    assert SnapshotStore(tmp_path / "empty").warm_start(IntervalStore()) == 0
+
+
+def test_client_warm_starts_before_the_first_fetch(payloads, transport, make_client, tmp_path):
+    snapshot = SnapshotStore(tmp_path)
+    snapshot.append_block(CumulPriceBlock(payloads[EndPoint.API_CUMULATIVE_PRICE_URL]["NEM_DASHBOARD_CUMUL_PRICE"]))
+    error = aiohttp.ClientConnectionError("down")
+    faults = FaultInjectingTransport(transport, {EndPoint.API_CUMULATIVE_PRICE_URL: [Fault(error=error)] * 5})
+    warm_start = snapshot.warm_start
+    loaded = []
+
+    def record_warm_start(store):
+        loaded.append(([name for _, name in transport.calls], warm_start(store)))
+
+    snapshot.warm_start = record_warm_start
+    client = make_client(faults, snapshot=snapshot)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(aiohttp.ClientError):
+                await client.get_aemo_data(["nsw"])
+
+    asyncio.run(run())
+    # The history was loaded once, before the cumulative price feed was
+    # requested and even though that request failed.
+    (calls, added), = loaded
+    assert "NEM_DASHBOARD_CUMUL_PRICE" not in calls
+    assert added == 48 * 3
@@ -0,0 +1,73 @@
+"""stream_data filtering with and without ijson."""
+import asyncio
+import sys
+from datetime import timedelta
+
+import pytest
+
+from aemonemdata import EndPoint, ReplayTransport
+from aemonemdata.exceptions import ClientError
+
+
+@pytest.fixture(params=["ijson", "json"])
+def decoder(request, monkeypatch):
+    """Stream with ijson, or decode the whole body when it is missing."""
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setitem(sys.modules, "ijson", None)
+    return request.param
+
+
+def stream(client, region, period_type=None):
+    """Return the records streamed for a region."""
+
+    async def run():
+        return [record async for record in client.stream_data(region, period_type)]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("period_type", [None, "ACTUAL", "FORECAST"])
+def test_filters(decoder, payloads, transport, make_client, period_type):
+    raw = payloads[EndPoint.API_5MIN_URL]["5MIN"]
+    expected = [
+        (record["SETTLEMENTDATE"], record["PERIODTYPE"])
+        for record in raw
+        if record["REGIONID"] == "VIC1" and period_type in (None, record["PERIODTYPE"])
+    ]
+    records = stream(make_client(transport), "VIC1", period_type)
+    assert expected
+    assert [
+        (record["SETTLEMENTDATE"].replace(tzinfo=None).isoformat(), record["PERIODTYPE"])
+        for record in records
+    ] == expected
+    assert {record["REGIONID"] for record in records} == {"VIC1"}
+
+
+def test_records_are_normalised(decoder, transport, make_client):
+    records = stream(make_client(transport), "NSW1")
+    for record in records:
+        offset = timedelta(minutes=5 if record["PERIODTYPE"] == "ACTUAL" else 30)
+        assert record["SETTLEMENTDATE"].utcoffset() == timedelta(hours=10)
+        assert record["PERIODSTARTDATE"] == record["SETTLEMENTDATE"] - offset
+        assert record["SPOTPRICEPERKW"] == round(record["RRP"] / 1000, 4)
+
+
+def test_matches_get_data(decoder, transport, make_client):
+    actual, forecast = asyncio.run(make_client(transport).get_data("QLD1"))
+    assert stream(make_client(transport), "QLD1", "ACTUAL") == actual
+    assert stream(make_client(transport), "QLD1", "FORECAST") == forecast
+
+
+def test_unknown_region(decoder, transport, make_client):
+    assert stream(make_client(transport), "WA1") == []
+
+
+@pytest.mark.parametrize("payloads, match", [
+    ({}, "404"),
+    ({EndPoint.API_5MIN_URL: b'{"5MIN": [{"REGIONID": '}, "json"),
+])
+def test_errors(decoder, make_client, payloads, match):
+    with pytest.raises(ClientError, match=match):
+        stream(make_client(ReplayTransport(payloads)), "NSW1")
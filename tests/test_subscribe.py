@@ -0,0 +1,30 @@
+"""AemoNemData.subscribe over a ReplayTransport."""
+import asyncio
+import copy
+from datetime import datetime, timedelta
+
+import aemonemdata.aemonem
+from aemonemdata import AemoNemData, EndPoint
+
+
+def test_subscribe_fetches_each_report_once_per_interval(payloads, transport, monkeypatch):
+    monkeypatch.setattr(aemonemdata.aemonem, "next_publish_time", lambda now, offset: now)
+    client = AemoNemData(transport=transport)
+    summary = payloads[EndPoint.API_ELEC_NEM_SUMMARY_URL]
+
+    async def run():
+        subscription = client.subscribe(["nsw"])
+        first = await anext(subscription)
+        settlement_date = first["current_30min_forecast"]["NSW1"]["settlement_date"]
+        transport.calls.clear()
+        published = copy.deepcopy(summary)
+        for record in published["ELEC_NEM_SUMMARY"]:
+            record["SETTLEMENTDATE"] = (datetime.fromisoformat(record["SETTLEMENTDATE"]) + timedelta(minutes=5)).isoformat()
+        transport.set_payload(EndPoint.API_ELEC_NEM_SUMMARY_URL, published)
+        second = await anext(subscription)
+        await subscription.aclose()
+        return settlement_date, second["current_30min_forecast"]["NSW1"]["settlement_date"]
+
+    previous, latest = asyncio.run(asyncio.wait_for(run(), 5))
+    assert latest - previous == timedelta(minutes=5)
+    assert [name for _, name in transport.calls] == ["ELEC_NEM_SUMMARY", "NEM_DASHBOARD_CUMUL_PRICE"]
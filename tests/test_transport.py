@@ -0,0 +1,120 @@
+"""AemoNemData over the replay and fault injecting transports."""
+import asyncio
+import json
+from datetime import timedelta
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from aemonemdata import EndPoint, Fault, FaultInjectingTransport, ReplayTransport, create_replay_app
+from aemonemdata.exceptions import ClientError
+
+STATES = ["nsw", "qld", "vic"]
+DASHBOARD_REPORTS = {"NEM_DASHBOARD_CUMUL_PRICE", "NEM_DASHBOARD_MARKET_PRICE_LIMITS", "ELEC_NEM_SUMMARY"}
+
+
+def test_replay_get_aemo_data(transport, make_client):
+    results = asyncio.run(make_client(transport).get_aemo_data(STATES))
+    assert set(results["current_30min_forecast"]) == {"NSW1", "QLD1", "VIC1"}
+    assert not results["degraded"]
+    assert {name for _, name in transport.calls} == DASHBOARD_REPORTS
+    assert len(transport.calls) == len(DASHBOARD_REPORTS)
+
+
+def test_concurrent_calls_get_their_own_results(payloads, transport, make_client):
+    client = make_client(transport)
+    summary = dict(payloads[EndPoint.API_ELEC_NEM_SUMMARY_URL])
+    summary["ELEC_NEM_SUMMARY_MARKET_NOTICE"] = [{"ID": 1}]
+    transport.set_payload(EndPoint.API_ELEC_NEM_SUMMARY_URL, summary)
+
+    async def run():
+        return await asyncio.gather(client.get_aemo_data(["nsw"]), client.get_aemo_data(["vic", "qld"]))
+
+    nsw, others = asyncio.run(run())
+    assert nsw is not others
+    assert set(nsw["current_30min_forecast"]) == {"NSW1"}
+    assert set(others["current_30min_forecast"]) == {"QLD1", "VIC1"}
+    # The new notice is reported once, by whichever call parsed it.
+    assert len(nsw["changes"] + others["changes"]) == 1
+
+
+def test_replay_from_directory(tmp_path, payloads, make_client):
+    for endpoint, payload in payloads.items():
+        (tmp_path / f'{endpoint.value.rsplit("/", 1)[-1]}.json').write_text(json.dumps(payload))
+    transport = ReplayTransport.from_directory(tmp_path)
+    actual, forecast = asyncio.run(make_client(transport).get_data("NSW1"))
+    assert len(actual) == 48
+    assert forecast
+
+
+def test_replay_unknown_endpoint(make_client):
+    with pytest.raises(ClientError, match="404"):
+        asyncio.run(make_client(ReplayTransport({})).get_aemo_data(STATES))
+
+
+def test_fault_retried(transport, make_client):
+    faults = FaultInjectingTransport(transport, {EndPoint.API_CUMULATIVE_PRICE_URL: [Fault(status=503)]})
+    results = asyncio.run(make_client(faults).get_aemo_data(STATES))
+    assert not results["degraded"]
+    assert len(transport.calls) == len(DASHBOARD_REPORTS)
+
+
+def test_fault_degrades_optional_endpoint(transport, make_client):
+    error = aiohttp.ClientConnectionError("down")
+    faults = FaultInjectingTransport(transport, {EndPoint.API_ELEC_NEM_SUMMARY_URL: [Fault(error=error)] * 2})
+    results = asyncio.run(make_client(faults).get_aemo_data(STATES))
+    assert results["degraded"]
+    assert set(results["errors"]) == {EndPoint.API_ELEC_NEM_SUMMARY_URL.name}
+    assert results["current_30min_forecast"]["NSW1"]["total_demand"] is None
+
+
+def test_fault_without_cache_raises(transport, make_client):
+    error = aiohttp.ClientConnectionError("down")
+    faults = FaultInjectingTransport(transport, {EndPoint.API_CUMULATIVE_PRICE_URL: [Fault(error=error)] * 2})
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(make_client(faults).get_aemo_data(STATES))
+
+
+def test_fault_serves_stale(transport, make_client):
+    faults = FaultInjectingTransport(transport)
+    client = make_client(faults)
+
+    async def run():
+        await client.get_aemo_data(STATES)
+        faults.add_faults(EndPoint.API_CUMULATIVE_PRICE_URL, [Fault(status=500)] * 2)
+        return await client.get_aemo_data(STATES)
+
+    results = asyncio.run(run())
+    assert results["degraded"]
+    assert results["stale"] == ["NEM_DASHBOARD_CUMUL_PRICE"]
+    assert set(results["current_30min_forecast"]) == {"NSW1", "QLD1", "VIC1"}
+
+
+def test_slow_fetch_serves_stale(transport, make_client):
+    faults = FaultInjectingTransport(transport)
+    client = make_client(faults, stale_timeout=timedelta(seconds=0.05))
+
+    async def run():
+        await client.get_aemo_data(STATES)
+        faults.add_faults(EndPoint.API_CUMULATIVE_PRICE_URL, [Fault(delay=0.5)])
+        results = await client.get_aemo_data(STATES)
+        await asyncio.sleep(0.6)
+        return results
+
+    results = asyncio.run(run())
+    assert results["stale"] == ["NEM_DASHBOARD_CUMUL_PRICE"]
+
+
+def test_replay_app(payloads):
+
+    async def run():
+        async with TestClient(TestServer(create_replay_app(payloads))) as client:
+            found = await client.get(EndPoint.API_CUMULATIVE_PRICE_URL.value)
+            missing = await client.get('/api/v1/UNKNOWN')
+            return found.status, await found.json(), missing.status
+
+    status, body, missing = asyncio.run(run())
+    assert status == 200
+    assert body == payloads[EndPoint.API_CUMULATIVE_PRICE_URL]
+    assert missing == 404